@@ -0,0 +1,210 @@
+"""Offline benchmark suite for the scraping, preprocessing, modeling and API hot paths.
+
+    python -m benchmarks.run --out bench.json                       # measure and save
+    python -m benchmarks.run --baseline bench.json --tolerance 0.15 # exit 1 on a regression
+
+Everything runs from checked-in fixtures: HTML pages under fixtures/html, a
+synthetic detail.jsonl (benchmarks.synth) and a tiny randomly initialised BERT
+(fixtures/tiny_bert), so numbers are comparable between commits on one machine
+but say nothing about production model quality or absolute latency.
+"""
+import os, sys, glob, json, time, shutil, argparse, platform, statistics, subprocess, tempfile
+from concurrent.futures import ThreadPoolExecutor
+import yaml
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+TINY_BERT = os.path.join(FIXTURES, "tiny_bert")
+GROUPS = ("scraping", "preprocess", "modeling", "api")
+
+def timed(fn, rounds=5):
+    """Median wall time of fn() over `rounds` runs, after one untimed warm-up call."""
+    fn()
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def rate(name, n, seconds, unit):
+    return name, {"value": round(n / seconds, 2), "unit": unit, "higher_is_better": True}
+
+def latency(name, ms):
+    return name, {"value": round(ms, 3), "unit": "ms", "higher_is_better": False}
+
+def percentile(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+def tiny_checkpoint(out_dir, seed=0):
+    """Randomly initialised BertForSequenceClassification from fixtures/tiny_bert, saved as safetensors."""
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+    torch.manual_seed(seed)
+    model = AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(TINY_BERT))
+    model.save_pretrained(out_dir, safe_serialization=True)
+    for f in ("vocab.txt", "tokenizer_config.json"):
+        shutil.copy(os.path.join(TINY_BERT, f), out_dir)
+    return out_dir
+
+def bench_scraping(cfg, args):
+    from src.scraping.extract import BACKENDS, get_extractor
+    pages = [open(p, "r", encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(FIXTURES, "html", "*.html")))]
+    reps = max(1, args.pages // len(pages))
+    for backend in BACKENDS:
+        ex = get_extractor(cfg, backend)
+        run = lambda: [ex.detail(h) for _ in range(reps) for h in pages]
+        yield rate(f"parse_detail.{backend}", reps * len(pages), timed(run, args.rounds), "pages/s")
+
+def bench_preprocess(cfg, args, detail_path):
+    from src.preprocess.clean_normalize import clean_text, process_chunk
+    from src.preprocess.jsonio import loads
+    with open(detail_path, "rb") as f:
+        texts = [loads(line).get("description") or "" for line in f]
+    yield rate("clean_text", len(texts), timed(lambda: [clean_text(t) for t in texts], args.rounds), "records/s")
+    job = (detail_path, 0, os.path.getsize(detail_path))
+    yield rate("clean_normalize", len(texts), timed(lambda: process_chunk(job), args.rounds), "records/s")
+
+def eval_texts(detail_path, n):
+    from src.preprocess.clean_normalize import clean_text
+    from src.preprocess.jsonio import loads
+    with open(detail_path, "rb") as f:
+        return [clean_text(loads(line).get("description")) for _, line in zip(range(n), f)]
+
+def bench_modeling(ckpt, args, detail_path):
+    from src.modeling.backends import load_backend, load_tokenizer
+    from src.modeling.engine import predict_logits
+    tok, texts = load_tokenizer(ckpt), eval_texts(detail_path, args.eval_examples)
+    for backend in args.backends:
+        mdl = load_backend(ckpt, backend, args.threads)
+        secs = timed(lambda: predict_logits(tok, mdl, texts, args.batch_size), args.rounds)
+        yield rate(f"evaluate.{backend}", len(texts), secs, "examples/s")
+
+def bench_api(ckpt, args, detail_path):
+    # api.py reads its settings at import time; the prediction cache is off so every call hits the model
+    os.environ.update({"KP_CKPT": ckpt, "KP_BACKEND": args.backends[0], "KP_CACHE_SIZE": "0", "KP_WARMUP": "1"})
+    if args.threads:
+        os.environ["KP_TORCH_THREADS"] = str(args.threads)
+    from fastapi.testclient import TestClient
+    from src.app.api import app
+    texts = eval_texts(detail_path, args.requests)
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 120
+        while client.get("/health").status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"API not ready: {client.get('/health').json()}")
+            time.sleep(0.05)
+
+        def call(text):
+            t0 = time.perf_counter()
+            client.get("/classify", params={"text": text}).raise_for_status()
+            return 1000 * (time.perf_counter() - t0)
+
+        for t in texts[:10]:
+            call(t)
+        lat = [call(t) for t in texts]
+        yield latency("classify.p50", statistics.median(lat))
+        yield latency("classify.p95", percentile(lat, 95))
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(call, texts))
+        yield rate(f"classify.c{args.concurrency}", len(texts), time.perf_counter() - t0, "req/s")
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    cfg = yaml.safe_load(open(args.config, "r", encoding="utf-8"))
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="kp-bench-") as tmp:
+        from .synth import generate
+        detail = generate(os.path.join(tmp, "detail.jsonl"), args.records, args.seed)
+        ckpt = tiny_checkpoint(os.path.join(tmp, "tiny_bert")) if {"modeling", "api"} & set(args.only) else None
+        stages = {
+            "scraping": lambda: bench_scraping(cfg, args),
+            "preprocess": lambda: bench_preprocess(cfg, args, detail),
+            "modeling": lambda: bench_modeling(ckpt, args, detail),
+            "api": lambda: bench_api(ckpt, args, detail),
+        }
+        for group in GROUPS:
+            if group not in args.only:
+                continue
+            for name, res in stages[group]():
+                results[name] = res
+                print(f"{name:24s} {res['value']:12.2f} {res['unit']}", flush=True)
+    torch = sys.modules.get("torch")
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "torch_threads": torch.get_num_threads() if torch else None,
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        },
+        "results": results,
+    }
+
+def compare(current, baseline, tolerance):
+    """Per-benchmark change vs. baseline; a regression is a move in the bad direction beyond tolerance."""
+    rows, regressions = [], []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["value"]:
+            rows.append((name, None, cur["value"], None, "new"))
+            continue
+        change = cur["value"] / base["value"] - 1
+        worse = -change if cur["higher_is_better"] else change
+        status = "REGRESSION" if worse > tolerance else "improved" if -worse > tolerance else "ok"
+        if status == "REGRESSION":
+            regressions.append(name)
+        rows.append((name, base["value"], cur["value"], change, status))
+    for name in sorted(baseline["results"].keys() - current["results"].keys()):
+        rows.append((name, baseline["results"][name]["value"], None, None, "missing"))
+    return rows, regressions
+
+def main():
+    ap = argparse.ArgumentParser(description="offline benchmarks with JSON output and baseline comparison")
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slow-down before failing")
+    ap.add_argument("--rounds", type=int, default=5, help="timed repetitions per benchmark (median is kept)")
+    ap.add_argument("--pages", type=int, default=200, help="detail pages parsed per round")
+    ap.add_argument("--records", type=int, default=5000, help="synthetic detail.jsonl records")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--eval-examples", type=int, default=512)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--backends", nargs="+", default=["torch"], help="model backends for evaluate (first one serves the API)")
+    ap.add_argument("--threads", type=int, default=None, help="intra-op threads (default: library default)")
+    ap.add_argument("--requests", type=int, default=200, help="/classify calls per latency run")
+    ap.add_argument("--concurrency", type=int, default=8)
+    args = ap.parse_args()
+
+    current = run(args)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"[✓] wrote {args.out}")
+    if args.baseline:
+        baseline = json.load(open(args.baseline, "r", encoding="utf-8"))
+        rows, regressions = compare(current, baseline, args.tolerance)
+        print(f"\nvs. {args.baseline} (commit {baseline['meta'].get('commit')}, tolerance {args.tolerance:.0%})")
+        for name, base, cur, change, status in rows:
+            fmt = lambda v: f"{v:12.2f}" if v is not None else f"{'-':>12s}"
+            ch = f"{change:+8.1%}" if change is not None else f"{'':8s}"
+            print(f"{name:24s} {fmt(base)} -> {fmt(cur)} {ch}  {status}")
+        if regressions:
+            print(f"[x] {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("[✓] no regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os, random, argparse
+from datetime import datetime, timezone
+from src.preprocess.jsonio import dumps_line
+
+CITIES = {
+    "İstanbul": ["Fatih", "Sarıyer", "Üsküdar", "Beyoğlu"], "Ankara": ["Altındağ", "Çankaya"],
+    "İzmir": ["Konak", "Selçuk", "Bergama"], "Bursa": ["Osmangazi", "Yıldırım", "İznik"],
+    "Edirne": ["Merkez", "Uzunköprü"], "Konya": ["Selçuklu", "Meram", "Karatay"],
+    "Antalya": ["Serik", "Kaş", "Muratpaşa"], "Mardin": ["Artuklu", "Midyat"],
+}
+KINDS = ["Camii", "Kalesi", "Köprüsü", "Hanı", "Hamamı", "Medresesi", "Türbesi", "Çeşmesi", "Kervansarayı", "Kulesi"]
+NAMES = ["Selimiye", "Ulu", "Yeşil", "Sultan Ahmet", "Rüstem Paşa", "Mehmet Bey", "Hacı Bayram", "Karatay",
+         "Alaeddin", "Taş", "Eski", "Yeni", "Kurşunlu", "Mihrimah Sultan", "Koza", "Zinciriye"]
+WORDS = ("tarihi yapı dönem döneminde yüzyılda inşa edilmiştir osmanlı selçuklu bizans roma antik mimar sultan "
+         "paşa bey taş mermer tuğla ahşap kubbe minare avlu kapı kemer duvar sütun çini süsleme kitabe "
+         "restorasyon onarım geçirmiştir şehir merkezinde bulunan ziyarete açıktır vakfiyesine göre "
+         "külliyenin bir parçası olarak yaptırılmıştır ve ile bu da de olan için").split()
+NOISE = ["  ", "\n", "\t", "\u200b", " \n  "]
+
+def description(rng, min_words=20, max_words=600):
+    """Scraped-looking text: sentences of random words with the whitespace junk clean_text removes."""
+    n, out = rng.randint(min_words, max_words), []
+    while n > 0:
+        k = min(n, rng.randint(6, 18))
+        s = " ".join(rng.choice(WORDS) for _ in range(k))
+        out.append(s[0].upper() + s[1:] + ".")
+        out.append(rng.choice(NOISE) if rng.random() < 0.3 else " ")
+        n -= k
+    return "".join(out)
+
+def record(rng, i):
+    city = rng.choice(list(CITIES))
+    name = f"{rng.choice(NAMES)} {rng.choice(KINDS)}"
+    return {
+        "name": name,
+        "description": description(rng) if rng.random() > 0.02 else None,
+        "city": city,
+        "district": rng.choice(CITIES[city]) if rng.random() > 0.1 else None,
+        "source_url": f"https://kulturportali.gov.tr/turkiye/{city.lower()}/gezilecekyer/anit-{i}",
+        "last_crawled_at": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+        "etag": f'"{rng.getrandbits(64):016x}"',
+        "last_modified": None,
+    }
+
+def generate(path, n=5000, seed=0):
+    """Write n synthetic fetch_detail records to path (same seed -> same bytes)."""
+    rng = random.Random(seed)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        for i in range(n):
+            f.write(dumps_line(record(rng, i)))
+    return path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="synthetic data/raw/detail.jsonl for benchmarks and offline runs")
+    ap.add_argument("--out", default="data/raw/detail.jsonl")
+    ap.add_argument("-n", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    print(f"[✓] wrote {generate(args.out, args.n, args.seed)}: {args.n} records")
@@ -1,24 +1,292 @@
-from fastapi import FastAPI, Query
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import os, time, asyncio, functools
+from collections import namedtuple
+from contextlib import asynccontextmanager, nullcontext
+from typing import List, Optional
+from fastapi import FastAPI, Query, HTTPException, Response, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from .batching import MicroBatcher
+from .cache import PredictionCache, checkpoint_fingerprint
+from ..modeling.backends import load_backend, load_tokenizer, softmax, has_safetensors
+from ..search.dense import DenseIndex
+from ..search.lexical import LexicalIndex
+from ..search.store import RecordStore
+from ..search.qa import QAPipeline
+from ..modeling.reader import ExtractiveReader
+from ..metrics import REGISTRY, SamplingProfiler, histogram, enabled as metrics_enabled
 
-app = FastAPI(title="Kultur Portal Monuments API")
+CKPT = os.environ.get("KP_CKPT", "runs/cls/best")
+BACKEND = os.environ.get("KP_BACKEND", "torch")               # torch | int8 | onnx
+BATCH_MAX = int(os.environ.get("KP_BATCH_MAX", "16"))          # 1 disables micro-batching
+BATCH_WAIT_MS = float(os.environ.get("KP_BATCH_WAIT_MS", "5"))
+CACHE_SIZE = int(os.environ.get("KP_CACHE_SIZE", "10000"))      # 0 disables the prediction cache
+CACHE_TTL_S = float(os.environ.get("KP_CACHE_TTL_S", "3600"))
+CACHE_MB = float(os.environ.get("KP_CACHE_MB", "32"))
+WARMUP = int(os.environ.get("KP_WARMUP", "2"))                  # warm-up passes before reporting ready
+THREADS = int(os.environ.get("KP_TORCH_THREADS", "0"))          # intra-op threads per worker (0 = library default)
+RELOAD_CHECK_S = float(os.environ.get("KP_RELOAD_CHECK_S", "30"))  # re-fingerprint the checkpoint; on change reload + clear cache (0 = off)
+PRELOAD = os.environ.get("KP_PRELOAD", "0") == "1"              # load at import, e.g. for gunicorn --preload
+DENSE_INDEX = os.environ.get("KP_DENSE_INDEX", "data/index/dense")  # built by python -m src.search.dense
+LEXICAL_INDEX = os.environ.get("KP_LEXICAL_INDEX", "data/index/lexical")  # built by python -m src.search.lexical
+PROCESSED = os.environ.get("KP_PROCESSED", "data/processed/monuments.jsonl")  # contexts for /qa
+QA_CKPT = os.environ.get("KP_QA_CKPT", "runs/qa/best")         # AutoModelForQuestionAnswering checkpoint
+QA_TOPK = int(os.environ.get("KP_QA_TOPK", "5"))                # contexts the reader sees per question
+QA_BATCH = int(os.environ.get("KP_QA_BATCH", "16"))             # reader windows per forward pass
+QA_CONTEXT_CACHE = int(os.environ.get("KP_QA_CONTEXT_CACHE", "2048"))  # tokenised contexts kept (LRU)
+# KP_METRICS=1 turns on the timers behind GET /metrics (read by src.metrics)
+PROFILE = os.environ.get("KP_PROFILE", "")                      # write sampled stacks here on shutdown
 
-CKPT = "runs/cls/best"
-tok = AutoTokenizer.from_pretrained(CKPT)
-mdl = AutoModelForSequenceClassification.from_pretrained(CKPT)
-mdl.eval()
+PHASE = histogram("kp_api_phase_seconds", "Time per predict_batch phase (tokenise, forward, softmax, serialise)", ("phase",))
+BATCH = histogram("kp_api_batch_size", "Texts per forward pass", (), (1, 2, 4, 8, 16, 32, 64, 128))
+REQUEST = histogram("kp_api_request_seconds", "End-to-end request time", ("method", "route", "status"))
+
+# published as one object so a reload swaps tokenizer, weights and labels in a single assignment
+Model = namedtuple("Model", "tok backend id2label")
+
+class ModelState:
+    """Everything the endpoints need from the model, filled in by load_model()."""
+    model = None
+    status = "loading"
+    error = None
+    load_s = None
+    warmup_ms = None
+    fingerprint = None
+
+state = ModelState()
+cache = PredictionCache(CACHE_SIZE, CACHE_TTL_S, int(CACHE_MB * 2**20)) if CACHE_SIZE > 0 else None
+
+def load_model(ckpt=CKPT, kind=BACKEND):
+    """Load tokenizer + backend. The checkpoint is only read: model.safetensors is preferred when it
+    exists, otherwise pytorch_model.bin is loaded as is (convert offline with export_onnx --safetensors-only)."""
+    t0 = time.perf_counter()
+    if THREADS:
+        import torch
+        torch.set_num_threads(THREADS)
+    if not has_safetensors(ckpt):
+        print(f"[!] {ckpt} has no model.safetensors; run python -m src.modeling.export_onnx --ckpt {ckpt} "
+              "--safetensors-only", flush=True)
+    # fingerprint before reading, so a checkpoint rewritten during the load is caught by the next check
+    fingerprint = checkpoint_fingerprint(ckpt, kind)
+    tok, backend = load_tokenizer(ckpt), load_backend(ckpt, kind)
+    # one attribute assignment; predict_batch reads state.model once, so a batch never mixes old and new parts
+    state.model = Model(tok, backend, backend.config.id2label)
+    state.fingerprint = fingerprint
+    if cache:
+        cache.bind(fingerprint)
+    state.load_s = round(time.perf_counter() - t0, 3)
+
+def reload_if_changed(ckpt=CKPT, kind=BACKEND):
+    """Reload the model (and drop cached predictions) when the checkpoint on disk changed. True if reloaded."""
+    if state.status != "ok" or checkpoint_fingerprint(ckpt, kind) == state.fingerprint:
+        return False
+    print(f"[i] checkpoint {ckpt} changed, reloading", flush=True)
+    try:
+        load_model(ckpt, kind)
+    except Exception as e:  # keep serving the old weights; retried on the next check
+        print(f"[x] reload failed -> {type(e).__name__}: {e}", flush=True)
+        return False
+    return True
+
+async def watch_checkpoint():
+    while True:
+        await asyncio.sleep(RELOAD_CHECK_S)
+        await run_in_threadpool(reload_if_changed)
+
+def warm_up(passes=WARMUP):
+    """Run short and long batches so first requests don't pay for lazy allocations/graph setup."""
+    t0 = time.perf_counter()
+    texts = ["Anıt", "Osmanlı dönemine ait cami ve külliye. " * 40]
+    for _ in range(passes):
+        predict_batch(texts[:1], record=False)
+        predict_batch(texts * max(1, BATCH_MAX // 2), record=False)
+    state.warmup_ms = round(1000 * (time.perf_counter() - t0), 1)
+
+def initialise():
+    try:
+        if state.model is None:
+            load_model()
+        warm_up()
+        state.status = "ok"
+    except Exception as e:
+        state.status, state.error = "error", f"{type(e).__name__}: {e}"
+        print(f"[x] model init failed -> {state.error}", flush=True)
+
+def predict_batch(texts, record=True):
+    """One padded forward pass over `texts`; record=False keeps it out of the metrics (warm-up)."""
+    phase = PHASE.time if record else lambda _: nullcontext()
+    m = state.model
+    if record:
+        BATCH.observe(len(texts))
+    with phase("tokenise"):
+        x = m.tok(texts, return_tensors="np", truncation=True, padding=True)
+    with phase("forward"):
+        logits = m.backend.logits(x)
+    with phase("softmax"):
+        probs = softmax(logits)
+        pred_ids, scores = probs.argmax(-1), probs.max(-1)
+    with phase("serialise"):
+        return [
+            {"label": m.id2label.get(int(i), str(int(i))), "score": float(s)}
+            for i, s in zip(pred_ids, scores)
+        ]
+
+if PRELOAD:
+    load_model()
+
+batcher = MicroBatcher(predict_batch, BATCH_MAX, BATCH_WAIT_MS) if BATCH_MAX > 1 else None
+# concurrent /qa requests share reader batches the same way
+qa_batcher = MicroBatcher(lambda qs: qa_pipeline().answer(qs), BATCH_MAX, BATCH_WAIT_MS) if BATCH_MAX > 1 else None
+
+@asynccontextmanager
+async def lifespan(app):
+    # load in the background so /health can answer "loading" while weights are read
+    init = asyncio.create_task(run_in_threadpool(initialise))
+    profiler = SamplingProfiler(PROFILE).start() if PROFILE else None
+    watcher = asyncio.create_task(watch_checkpoint()) if RELOAD_CHECK_S > 0 else None
+    for b in (batcher, qa_batcher):
+        if b:
+            await b.start()
+    yield
+    for b in (batcher, qa_batcher):
+        if b:
+            await b.stop()
+    if not init.done():
+        init.cancel()
+    if watcher:
+        watcher.cancel()
+    if profiler:
+        print(f"[i] profile: {profiler.stop()} samples -> {PROFILE}", flush=True)
+
+app = FastAPI(title="Kultur Portal Monuments API", lifespan=lifespan)
+
+if metrics_enabled():
+    @app.middleware("http")
+    async def time_request(request: Request, call_next):
+        t0 = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")  # the path template, so /qa?q=... stays one series
+        REQUEST.observe(time.perf_counter() - t0, request.method, route.path if route else "unmatched",
+                        str(response.status_code))
+        return response
+
+class BatchRequest(BaseModel):
+    texts: List[str]
+
+class QABatchRequest(BaseModel):
+    questions: List[str]
+    k: Optional[int] = Field(None, ge=1, le=20)  # same bound as GET /qa
+
+def require_ready():
+    if state.status != "ok":
+        raise HTTPException(status_code=503, detail={"status": state.status, "error": state.error})
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+def health(response: Response):
+    if state.status != "ok":
+        response.status_code = 503
+    return {
+        "status": state.status,
+        "ready": state.status == "ok",
+        "backend": state.model.backend.name if state.model else BACKEND,
+        "load_s": state.load_s,
+        "warmup_ms": state.warmup_ms,
+        "error": state.error,
+    }
+
+@app.get("/metrics")
+def metrics():
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail="metrics disabled; start the API with KP_METRICS=1")
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/stats")
+def cache_stats():
+    return cache.stats() if cache else {"enabled": False}
+
+@functools.lru_cache(maxsize=1)
+def dense_index():
+    return DenseIndex(DENSE_INDEX)
+
+@app.get("/search")
+def search(q: str = Query(..., description="Free-text query"), k: int = Query(10, ge=1, le=100),
+           nprobe: int = Query(8, ge=1, description="IVF lists to scan (ignored for a flat index)")):
+    if not os.path.exists(os.path.join(DENSE_INDEX, "index.json")):
+        raise HTTPException(status_code=503, detail=f"dense index not built: {DENSE_INDEX}")
+    return {"query": q, "results": dense_index().search(q, k, nprobe)}
+
+@functools.lru_cache(maxsize=1)
+def lexical_index():
+    return LexicalIndex.load(LEXICAL_INDEX)
+
+@app.get("/search/keyword")
+def search_keyword(q: str = Query(..., description="Keywords (Turkish casing/suffixes handled)"),
+                   k: int = Query(10, ge=1, le=100)):
+    if not os.path.exists(os.path.join(LEXICAL_INDEX, "index.json")):
+        raise HTTPException(status_code=503, detail=f"lexical index not built: {LEXICAL_INDEX}")
+    return {"query": q, "results": lexical_index().search(q, k)}
+
+@functools.lru_cache(maxsize=1)
+def qa_pipeline():
+    reader = ExtractiveReader(QA_CKPT, batch_size=QA_BATCH, cache_size=QA_CONTEXT_CACHE, threads=THREADS or None)
+    return QAPipeline(lexical_index(), RecordStore(PROCESSED), reader, QA_TOPK)
+
+def require_qa():
+    for path in (os.path.join(LEXICAL_INDEX, "index.json"), PROCESSED, QA_CKPT):
+        if not os.path.exists(path):
+            raise HTTPException(status_code=503, detail=f"/qa needs {path}")
+
+@app.get("/qa")
+async def qa(q: str = Query(..., description="Question about a monument"), k: int = Query(None, ge=1, le=20)):
+    require_qa()
+    if qa_batcher:
+        return await qa_batcher.submit((q, k))
+    return (await run_in_threadpool(lambda: qa_pipeline().answer([(q, k)])))[0]
+
+@app.post("/qa/batch")
+async def qa_batch(req: QABatchRequest):
+    require_qa()
+    if qa_batcher:
+        # same single reader worker as /qa, so the reader never runs two forwards at once
+        return {"results": list(await asyncio.gather(*(qa_batcher.submit((q, req.k)) for q in req.questions)))}
+    return {"results": await run_in_threadpool(lambda: qa_pipeline().answer([(q, req.k) for q in req.questions]))}
+
+@app.get("/qa/stats")
+def qa_stats():
+    if qa_pipeline.cache_info().currsize == 0:
+        return {"loaded": False}
+    return {"loaded": True, "context_cache": qa_pipeline().reader.contexts.stats()}
 
 @app.get("/classify")
-def classify(text: str = Query(..., description="Monument description (clean text)")):
-    x = tok(text, return_tensors="pt", truncation=True)
-    with torch.no_grad():
-        logits = mdl(**x).logits
-        pred_id = int(logits.argmax(-1))
-        score = float(logits.softmax(-1).max())
-    label = mdl.config.id2label.get(pred_id, str(pred_id))
-    return {"label": label, "score": score}
+async def classify(text: str = Query(..., description="Monument description (clean text)")):
+    require_ready()
+    # read before predicting: put() drops the result if a reload rebinds the cache meanwhile
+    version = cache.version if cache else None
+    hit = cache.get(text) if cache else None
+    if hit is not None:
+        return hit
+    if batcher:
+        res = await batcher.submit(text)
+    else:
+        res = (await run_in_threadpool(predict_batch, [text]))[0]
+    if cache:
+        cache.put(text, res, version)
+    return res
+
+@app.post("/classify/batch")
+async def classify_batch(req: BatchRequest):
+    require_ready()
+    version = cache.version if cache else None
+    out = [cache.get(t) if cache else None for t in req.texts]
+    todo = [i for i, r in enumerate(out) if r is None]
+    if batcher:
+        # through the batcher's single worker, so a batch never runs a forward pass alongside /classify
+        results = await asyncio.gather(*(batcher.submit(req.texts[i]) for i in todo))
+    else:
+        texts = [req.texts[i] for i in todo]
+        results = await run_in_threadpool(
+            lambda: [r for j in range(0, len(texts), max(BATCH_MAX, 1)) for r in predict_batch(texts[j:j + max(BATCH_MAX, 1)])])
+    for i, res in zip(todo, results):
+        out[i] = res
+        if cache:
+            cache.put(req.texts[i], res, version)
+    return {"results": out}
@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+class MicroBatcher:
+    """Collects concurrent single requests into one call of `fn(items) -> results`.
+
+    A batch is dispatched when it holds `max_batch` items or `max_wait_ms` after
+    its first item arrived. `fn` runs on one worker thread, so the event loop
+    keeps accepting requests while a forward pass is in flight and the model
+    is never called concurrently.
+    """
+
+    def __init__(self, fn, max_batch=16, max_wait_ms=5.0):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self.task = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batcher")
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, item):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, fut))
+        return await fut
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, [item for item, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
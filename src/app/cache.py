@@ -0,0 +1,127 @@
+import os, sys, time, hashlib, threading
+from collections import OrderedDict
+from ..preprocess.clean_normalize import clean_text
+
+_ENTRY_OVERHEAD = 200  # rough bytes per entry for the OrderedDict slot, tuple and dict shell
+
+def checkpoint_fingerprint(ckpt, *extra):
+    """Changes whenever any file in the checkpoint directory is replaced or rewritten."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in extra:
+        h.update(str(part).encode())
+    for name in sorted(os.listdir(ckpt)) if os.path.isdir(ckpt) else []:
+        st = os.stat(os.path.join(ckpt, name))
+        h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+class PredictionCache:
+    """Thread-safe LRU of predictions with a TTL and an approximate memory budget.
+
+    Keys are a hash of the input after clean_text(), so inputs that differ only
+    in whitespace share an entry. bind() ties the cache to a model fingerprint
+    and drops every entry when it changes; put() with the version read before
+    predicting drops results computed while a reload rebound the cache.
+    """
+
+    def __init__(self, max_items=10000, ttl_seconds=3600.0, max_bytes=32 * 2**20):
+        self.max_items = max_items
+        self.ttl = ttl_seconds
+        self.max_bytes = max_bytes
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    @staticmethod
+    def key(text):
+        return hashlib.blake2b(clean_text(text).encode("utf-8"), digest_size=16).digest()
+
+    def bind(self, version):
+        with self.lock:
+            if version != self.version:
+                self.data.clear()
+                self.bytes = 0
+                self.version = version
+
+    def get(self, text):
+        k = self.key(text)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.data.get(k)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value, size = entry
+            if expires < now:
+                del self.data[k]
+                self.bytes -= size
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.data.move_to_end(k)
+            self.hits += 1
+            return value
+
+    def put(self, text, value, version=None):
+        """Store a prediction; ignored (False) when `version` is given and the cache was rebound since."""
+        k = self.key(text)
+        size = len(k) + _ENTRY_OVERHEAD + sum(sys.getsizeof(v) for v in value.values())
+        with self.lock:
+            if version is not None and version != self.version:
+                return False
+            old = self.data.pop(k, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self.data[k] = (time.monotonic() + self.ttl, value, size)
+            self.bytes += size
+            while self.data and (len(self.data) > self.max_items or self.bytes > self.max_bytes):
+                _, (_, _, s) = self.data.popitem(last=False)
+                self.bytes -= s
+                self.evictions += 1
+        return True
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self.data),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "version": self.version,
+            }
+
+def self_check():
+    """A rewritten checkpoint changes the fingerprint, and binding the new fingerprint empties the cache."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as ckpt:
+        weights = os.path.join(ckpt, "model.safetensors")
+        with open(weights, "wb") as f:
+            f.write(b"v1")
+        cache = PredictionCache()
+        cache.bind(checkpoint_fingerprint(ckpt, "torch"))
+        cache.put("Selimiye  Camii", {"label": "Edirne", "score": 0.9})
+        assert cache.get("Selimiye Camii") is not None, "whitespace variants should share an entry"
+        same = checkpoint_fingerprint(ckpt, "torch")
+        with open(weights, "wb") as f:
+            f.write(b"v2 weights")
+        changed = checkpoint_fingerprint(ckpt, "torch")
+        assert same == cache.version != changed, "rewriting the checkpoint must change the fingerprint"
+        cache.bind(changed)
+        assert cache.stats()["items"] == 0 and cache.get("Selimiye Camii") is None, "stale predictions survived"
+        assert not cache.put("Selimiye Camii", {"label": "Edirne", "score": 0.9}, same), \
+            "a prediction from the old weights must not enter the rebound cache"
+        assert cache.get("Selimiye Camii") is None
+    print("[✓] cache: checkpoint change clears cached predictions and rejects in-flight ones")
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="prediction cache checks")
+    ap.add_argument("--self-check", action="store_true", help="verify that a changed checkpoint clears the cache and rejects in-flight predictions")
+    args = ap.parse_args()
+    if args.self_check:
+        self_check()
@@ -0,0 +1,57 @@
+import time, argparse, statistics, random, json
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+def percentile(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+def run(url, texts, requests_n=500, concurrency=16, batch=0):
+    """Fire `requests_n` calls at /classify (or /classify/batch with `batch` texts each) from `concurrency` threads."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def one(i):
+        t0 = time.perf_counter()
+        if batch:
+            r = session.post(f"{url}/classify/batch", json={"texts": random.sample(texts, min(batch, len(texts)))})
+        else:
+            r = session.get(f"{url}/classify", params={"text": texts[i % len(texts)]})
+        r.raise_for_status()
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        lat = list(pool.map(one, range(requests_n)))
+    wall = time.perf_counter() - t0
+    items = requests_n * (batch or 1)
+    return {
+        "requests": requests_n,
+        "concurrency": concurrency,
+        "p50_ms": round(1000 * statistics.median(lat), 2),
+        "p99_ms": round(1000 * percentile(lat, 99), 2),
+        "req_per_s": round(requests_n / wall, 1),
+        "texts_per_s": round(items / wall, 1),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="local load generator for the classify endpoints")
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--data", default="data/processed/monuments.jsonl", help="texts are taken from text_clean")
+    ap.add_argument("--requests", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--batch", type=int, default=0, help="texts per /classify/batch call (0 = single /classify)")
+    args = ap.parse_args()
+    texts = []
+    with open(args.data, "r", encoding="utf-8") as f:
+        for line in f:
+            t = json.loads(line).get("text_clean")
+            if t:
+                texts.append(t)
+            if len(texts) >= 2000:
+                break
+    print(json.dumps(run(args.url, texts, args.requests, args.concurrency, args.batch)))
+
+if __name__ == "__main__":
+    main()
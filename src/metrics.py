@@ -0,0 +1,210 @@
+import os, sys, time, bisect, threading
+from collections import Counter as _Counts
+from contextlib import contextmanager
+
+# Off unless KP_METRICS=1 (API) or a CLI calls enable(); while off, timers and counters return immediately.
+ENABLED = os.environ.get("KP_METRICS", "0") == "1"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+def enabled():
+    return ENABLED
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullTimer()
+
+class _Timer:
+    __slots__ = ("hist", "labels", "t0")
+
+    def __init__(self, hist, labels):
+        self.hist, self.labels = hist, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0, *self.labels)
+        return False
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination, rendered like prometheus_client's."""
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        if not ENABLED:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            s = self.series.get(labels)
+            if s is None:
+                s = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def time(self, *labels):
+        """with hist.time("forward"): ... observes the block's wall time in seconds."""
+        return _Timer(self, labels) if ENABLED else _NULL
+
+    def summary(self):
+        """label values -> (count, sum) for quick console reports."""
+        with self.lock:
+            return {k: (sum(s[:-1]), s[-1]) for k, s in self.series.items()}
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            series = {k: list(s) for k, s in self.series.items()}
+        for labels, s in sorted(series.items()):
+            acc = 0
+            for le, n in zip(self.buckets + (float("inf"),), s[:-1]):
+                acc += n
+                bound = "+Inf" if le == float("inf") else repr(le)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', bound)])} {acc}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {s[-1]!r}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {acc}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.series = _Counts()
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, n=1):
+        if not ENABLED:
+            return
+        with self.lock:
+            self.series[labels] += n
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self.lock:
+            series = dict(self.series)
+        for labels, n in sorted(series.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {n}"
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kw):
+        with self.lock:
+            m = self.metrics.get(name)
+            if m is None:
+                m = self.metrics[name] = cls(name, *args, **kw)
+            elif not isinstance(m, cls):
+                raise ValueError(f"metric {name} already registered as a {m.kind}")
+            return m
+
+    def histogram(self, name, help, labelnames=(), buckets=BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets)
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+REGISTRY = Registry()
+histogram, counter = REGISTRY.histogram, REGISTRY.counter
+
+class SamplingProfiler:
+    """Samples every thread's Python stack from a background thread via sys._current_frames().
+
+    stop() writes collapsed stacks ("thread;module:func;... count" per line), the
+    input format of flamegraph.pl and speedscope. Costs one stack walk per thread
+    per `interval`; nothing is installed in the profiled threads themselves.
+    """
+
+    def __init__(self, path, interval=0.005):
+        self.path, self.interval = path, interval
+        self.stacks = _Counts()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        return self.samples
+
+@contextmanager
+def collect(metrics_path=None, profile_path=None, interval=0.005):
+    """Enable metrics (and the sampling profiler) for a CLI run; write them out when it ends."""
+    if metrics_path:
+        enable()
+    prof = SamplingProfiler(profile_path, interval).start() if profile_path else None
+    try:
+        yield
+    finally:
+        if prof is not None:
+            print(f"[i] profile: {prof.stop()} samples -> {profile_path}", flush=True)
+        if metrics_path:
+            with open(metrics_path, "w", encoding="utf-8") as f:
+                f.write(REGISTRY.render())
+            print(f"[i] metrics -> {metrics_path}", flush=True)
+            for line in report():
+                print(f"    {line}", flush=True)
+
+def report():
+    """One line per histogram series: count, total and mean time."""
+    with REGISTRY.lock:
+        hists = [m for m in REGISTRY.metrics.values() if isinstance(m, Histogram)]
+    for h in hists:
+        for labels, (n, total) in sorted(h.summary().items()):
+            yield f"{h.name}{_labels(h.labelnames, labels)} n={n} total={total:.2f}s mean={1000 * total / max(n, 1):.1f}ms"
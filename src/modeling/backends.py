@@ -0,0 +1,79 @@
+import os
+import numpy as np
+from transformers import AutoConfig, AutoTokenizer
+
+BACKENDS = ("torch", "int8", "onnx")
+ONNX_FILE = "model.onnx"
+
+class TorchBackend:
+    """fp32 PyTorch, or dynamic int8 quantisation of every nn.Linear when quantize=True."""
+
+    def __init__(self, ckpt, quantize=False, threads=None):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        if threads:
+            torch.set_num_threads(threads)
+        self.torch = torch
+        self.name = "int8" if quantize else "torch"
+        self.model = AutoModelForSequenceClassification.from_pretrained(ckpt).eval()
+        if quantize:
+            from torch.ao.quantization import quantize_dynamic
+            self.model = quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.config = self.model.config
+
+    def logits(self, enc):
+        with self.torch.inference_mode():
+            x = {k: self.torch.from_numpy(np.asarray(v)) for k, v in enc.items()}
+            return self.model(**x).logits.float().numpy()
+
+class OnnxBackend:
+    """onnxruntime on the graph written by src.modeling.export_onnx."""
+
+    def __init__(self, ckpt, threads=None):
+        import onnxruntime as ort
+        path = os.path.join(ckpt, ONNX_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run python -m src.modeling.export_onnx --ckpt {ckpt}")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.name = "onnx"
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.inputs = [i.name for i in self.session.get_inputs()]
+        self.config = AutoConfig.from_pretrained(ckpt)
+
+    def logits(self, enc):
+        feed = {k: np.asarray(enc[k], dtype=np.int64) for k in self.inputs}
+        return self.session.run(["logits"], feed)[0]
+
+def has_safetensors(ckpt):
+    return os.path.isdir(ckpt) and any(f.endswith(".safetensors") for f in os.listdir(ckpt))
+
+def convert_safetensors(ckpt):
+    """Write model.safetensors next to a pytorch_model.bin checkpoint (offline step, never at serve time).
+
+    safetensors loads without unpickling and faster than the .bin; from_pretrained
+    picks it up automatically once it exists. Returns True when a file was written.
+    """
+    if has_safetensors(ckpt) or not os.path.exists(os.path.join(ckpt, "pytorch_model.bin")):
+        return False
+    from transformers import AutoModelForSequenceClassification
+    AutoModelForSequenceClassification.from_pretrained(ckpt).save_pretrained(ckpt, safe_serialization=True)
+    return True
+
+def load_backend(ckpt, kind="torch", threads=None):
+    if kind == "torch":
+        return TorchBackend(ckpt, threads=threads)
+    if kind == "int8":
+        return TorchBackend(ckpt, quantize=True, threads=threads)
+    if kind == "onnx":
+        return OnnxBackend(ckpt, threads=threads)
+    raise ValueError(f"unknown backend {kind!r}, expected one of {BACKENDS}")
+
+def load_tokenizer(ckpt):
+    return AutoTokenizer.from_pretrained(ckpt)
+
+def softmax(logits):
+    e = np.exp(logits - logits.max(-1, keepdims=True))
+    return e / e.sum(-1, keepdims=True)
@@ -0,0 +1,44 @@
+import os, datasets
+from ..preprocess.export_arrow import export, read_stamp, source_stamp
+
+DATA = "data/processed/monuments.jsonl"
+ARROW_DIR = "data/processed/arrow"
+
+def source_files(path=DATA, arrow_dir=ARROW_DIR):
+    """The files load_splits() would read, for cache fingerprints."""
+    files = [os.path.join(arrow_dir, f"{s}.arrow") for s in ("train", "validation")]
+    return files if all(os.path.exists(p) for p in files) else [path]
+
+def stale_reason(files, path):
+    """Why the Arrow splits no longer match `path` (None when they do, or when there is no JSONL to compare)."""
+    if not os.path.exists(path):
+        return None
+    current = source_stamp(path)
+    for p in files:
+        stamp = read_stamp(p)
+        if not stamp.get("source_mtime_ns"):
+            return f"{p} has no source stamp (older export_arrow)"
+        if any(stamp.get(k) != v for k, v in current.items()):
+            return f"{path} changed after {p} was exported"
+    return None
+
+def load_splits(path=DATA, arrow_dir=ARROW_DIR):
+    """train/validation DatasetDict.
+
+    Prefers the Arrow files from src.preprocess.export_arrow, which are
+    memory-mapped (no parsing, pages shared with the OS cache). If the JSONL
+    changed since they were exported (size/mtime stamp in the Arrow metadata),
+    they are re-exported first with the same validation ratio. Falls back to
+    parsing the JSONL once and using it for both splits, as before.
+    """
+    files = {s: os.path.join(arrow_dir, f"{s}.arrow") for s in ("train", "validation")}
+    if all(os.path.exists(p) for p in files.values()):
+        reason = stale_reason(files.values(), path)
+        if reason:
+            ratio = float(read_stamp(files["train"]).get("validation_ratio", 0.1))
+            print(f"[!] stale Arrow splits: {reason}; re-exporting {path} -> {arrow_dir}")
+            export(path, arrow_dir, ratio)
+        return datasets.DatasetDict({s: datasets.Dataset.from_file(p) for s, p in files.items()})
+    print(f"[!] {arrow_dir} not found, parsing {path} (run python -m src.preprocess.export_arrow)")
+    ds = datasets.load_dataset("json", data_files=path)["train"]
+    return datasets.DatasetDict({"train": ds, "validation": ds})
@@ -0,0 +1,33 @@
+import time
+import numpy as np
+
+def predict_logits(tok, backend, texts, batch_size=32, sort_by_length=True):
+    """Logits for `texts` in their original order, plus timing stats.
+
+    Texts are tokenised once without padding, sorted by token length and
+    padded per batch, so each forward pass only pays for its own longest
+    sequence instead of the longest one in the whole set.
+    """
+    enc = tok(list(texts), truncation=True)
+    ids = enc["input_ids"]
+    order = np.argsort([len(x) for x in ids], kind="stable") if sort_by_length else np.arange(len(ids))
+    out, batch_ms = None, []
+    t0 = time.perf_counter()
+    for s in range(0, len(order), batch_size):
+        idx = order[s:s + batch_size]
+        batch = tok.pad({k: [enc[k][i] for i in idx] for k in enc.keys()}, return_tensors="np")
+        tb = time.perf_counter()
+        logits = backend.logits(batch)
+        batch_ms.append(1000 * (time.perf_counter() - tb))
+        if out is None:
+            out = np.empty((len(ids), logits.shape[-1]), dtype=logits.dtype)
+        out[idx] = logits
+    wall = time.perf_counter() - t0
+    stats = {
+        "examples": len(ids),
+        "batches": len(batch_ms),
+        "examples_per_s": len(ids) / wall if wall else 0.0,
+        "batch_ms_p50": float(np.percentile(batch_ms, 50)) if batch_ms else 0.0,
+        "batch_ms_p95": float(np.percentile(batch_ms, 95)) if batch_ms else 0.0,
+    }
+    return (out if out is not None else np.empty((0, 0))), stats
@@ -1,31 +1,38 @@
-import datasets, evaluate
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import argparse, evaluate
+from .backends import load_backend, load_tokenizer, BACKENDS
+from .data import load_splits
+from .engine import predict_logits
 
 CKPT = "runs/cls/best"
 DATA = "data/processed/monuments.jsonl"
 
-def main():
-    tok = AutoTokenizer.from_pretrained(CKPT)
-    mdl = AutoModelForSequenceClassification.from_pretrained(CKPT)
+def main(backend="torch", ckpt=CKPT, batch_size=32, threads=None):
+    tok = load_tokenizer(ckpt)
+    mdl = load_backend(ckpt, backend, threads)
 
-    ds = datasets.load_dataset("json", data_files={"validation": DATA})["validation"]
+    ds = load_splits(DATA)["validation"]
     inv = {v:k for k,v in mdl.config.id2label.items()}
     ds = ds.filter(lambda x: x.get("city") in inv)
 
     acc = evaluate.load("accuracy")
     f1m = evaluate.load("f1")
 
-    preds, refs = [], []
-    for ex in ds:
-        x = tok(ex.get("text_clean",""), return_tensors="pt", truncation=True)
-        with torch.no_grad():
-            logits = mdl(**x).logits
-        preds.append(int(logits.argmax(-1)))
-        refs.append(int(inv[ex["city"]]))
+    texts = [t or "" for t in ds["text_clean"]]
+    logits, stats = predict_logits(tok, mdl, texts, batch_size)
+    preds = [int(p) for p in logits.argmax(-1)] if len(texts) else []
+    refs = [int(inv[c]) for c in ds["city"]]
 
     print("accuracy:", acc.compute(references=refs, predictions=preds))
     print("f1_macro:", f1m.compute(references=refs, predictions=preds, average="macro"))
+    print(f"throughput: {stats['examples_per_s']:.1f} examples/s over {stats['batches']} batches "
+          f"(batch latency p50 {stats['batch_ms_p50']:.1f} ms, p95 {stats['batch_ms_p95']:.1f} ms)")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--task", default="classify")
+    ap.add_argument("--backend", default="torch", choices=BACKENDS)
+    ap.add_argument("--ckpt", default=CKPT)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--threads", type=int, default=None, help="intra-op threads (default: library default)")
+    args = ap.parse_args()
+    main(args.backend, args.ckpt, args.batch_size, args.threads)
@@ -0,0 +1,72 @@
+import os, argparse, time
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from .backends import load_backend, convert_safetensors, ONNX_FILE, BACKENDS
+from .data import load_splits, DATA
+
+CKPT = "runs/cls/best"
+
+def export(ckpt=CKPT, opset=17):
+    tok = AutoTokenizer.from_pretrained(ckpt)
+    mdl = AutoModelForSequenceClassification.from_pretrained(ckpt).eval()
+    sample = tok(["örnek anıt metni", "ikinci"], return_tensors="pt", padding=True)
+    names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in sample]
+    axes = {k: {0: "batch", 1: "seq"} for k in names}
+    axes["logits"] = {0: "batch"}
+    out = os.path.join(ckpt, ONNX_FILE)
+    with torch.inference_mode():
+        torch.onnx.export(
+            mdl, tuple(sample[k] for k in names), out,
+            input_names=names, output_names=["logits"], dynamic_axes=axes,
+            opset_version=opset, dynamo=False,
+        )
+    print(f"[✓] exported {out}")
+    return out
+
+def parity(ckpt=CKPT, n=256, batch_size=16, data=DATA):
+    """Logit/argmax agreement of every backend against fp32 PyTorch on validation texts."""
+    tok = AutoTokenizer.from_pretrained(ckpt)
+    val = load_splits(data)["validation"]
+    texts = [t for t in val.select(range(min(n, len(val))))["text_clean"] if t]
+    batches = [tok(texts[i:i + batch_size], return_tensors="np", padding=True, truncation=True)
+               for i in range(0, len(texts), batch_size)]
+    results, ref = {}, None
+    for kind in BACKENDS:
+        try:
+            be = load_backend(ckpt, kind)
+        except (FileNotFoundError, ImportError) as e:
+            print(f"[!] skip {kind}: {e}")
+            continue
+        t0 = time.perf_counter()
+        logits = np.concatenate([be.logits(b) for b in batches])
+        ms = 1000 * (time.perf_counter() - t0) / max(len(texts), 1)
+        if ref is None:
+            ref = logits
+        results[kind] = {
+            "ms_per_example": round(ms, 3),
+            "max_abs_logit_diff": float(np.abs(logits - ref).max()),
+            "argmax_agreement": float((logits.argmax(-1) == ref.argmax(-1)).mean()),
+        }
+        print(f"{kind:5s} {results[kind]}")
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description="export the classifier to ONNX and check backend parity")
+    ap.add_argument("--ckpt", default=CKPT)
+    ap.add_argument("--opset", type=int, default=17)
+    ap.add_argument("--check", action="store_true", help="compare torch/int8/onnx logits on validation texts")
+    ap.add_argument("--n", type=int, default=256, help="validation texts for --check")
+    ap.add_argument("--data", default=DATA)
+    ap.add_argument("--safetensors-only", action="store_true", help="only convert pytorch_model.bin to model.safetensors")
+    args = ap.parse_args()
+    if convert_safetensors(args.ckpt):
+        print(f"[✓] wrote {args.ckpt}/model.safetensors")
+    if args.safetensors_only:
+        return
+    export(args.ckpt, args.opset)
+    if args.check:
+        parity(args.ckpt, args.n, data=args.data)
+
+if __name__ == "__main__":
+    main()
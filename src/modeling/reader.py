@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from transformers import AutoTokenizer
+
+class ContextCache:
+    """Thread-safe LRU of tokenised contexts: key -> (input_ids, char offsets) without special tokens."""
+
+    def __init__(self, max_items=2048):
+        self.max_items = max_items
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_encode(self, key, text, encode):
+        with self.lock:
+            hit = self.data.get(key)
+            if hit is not None:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+        value = encode(text)
+        with self.lock:
+            self.data[key] = value
+            while len(self.data) > self.max_items:
+                self.data.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self.lock:
+            return {"items": len(self.data), "max_items": self.max_items, "hits": self.hits, "misses": self.misses}
+
+class ExtractiveReader:
+    """SQuAD-style span reader (AutoModelForQuestionAnswering, BERT-style [CLS] q [SEP] c [SEP] inputs).
+
+    Contexts are tokenised once and cached; per question only the question is
+    tokenised and the cached ids are sliced into overlapping windows, so hot
+    monuments skip the tokenizer entirely. Windows from every question/context
+    pair in a call are scored in padded batches of `batch_size`.
+    """
+
+    def __init__(self, ckpt, max_length=384, stride=128, max_answer_len=30, batch_size=16,
+                 max_windows=4, cache_size=2048, threads=None):
+        import torch
+        from transformers import AutoModelForQuestionAnswering
+        if threads:
+            torch.set_num_threads(threads)
+        self.torch = torch
+        self.tok = AutoTokenizer.from_pretrained(ckpt)
+        self.model = AutoModelForQuestionAnswering.from_pretrained(ckpt).eval()
+        self.max_length = min(max_length, getattr(self.model.config, "max_position_embeddings", max_length))
+        self.stride = min(stride, self.max_length // 2)
+        self.max_answer_len, self.batch_size, self.max_windows = max_answer_len, batch_size, max_windows
+        self.contexts = ContextCache(cache_size)
+
+    def _encode_context(self, text):
+        enc = self.tok(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return np.asarray(enc["input_ids"], dtype=np.int64), np.asarray(enc["offset_mapping"], dtype=np.int64).reshape(-1, 2)
+
+    def _windows(self, q_ids, c_ids):
+        """(start, end) token ranges of the context windows that fit next to the question; capped at max_windows."""
+        room = max(self.max_length - len(q_ids) - 3, 16)
+        step = max(room - self.stride, 1)
+        starts = range(0, max(len(c_ids) - room, 0) + step, step)
+        return [(s, min(s + room, len(c_ids))) for s in starts][:self.max_windows]
+
+    def _forward(self, rows):
+        """rows: list of (q_ids, window_ids) -> start/end logits (len(rows), L) and the context token offset."""
+        cls, sep, pad = self.tok.cls_token_id, self.tok.sep_token_id, self.tok.pad_token_id
+        seqs = [np.concatenate([[cls], q, [sep], w, [sep]]) for q, w in rows]
+        width = max(len(s) for s in seqs)
+        ids = np.full((len(seqs), width), pad, dtype=np.int64)
+        types = np.zeros_like(ids)
+        mask = np.zeros_like(ids)
+        for i, ((q, _), s) in enumerate(zip(rows, seqs)):
+            ids[i, :len(s)] = s
+            mask[i, :len(s)] = 1
+            types[i, len(q) + 2:len(s)] = 1
+        with self.torch.inference_mode():
+            out = self.model(input_ids=self.torch.from_numpy(ids), attention_mask=self.torch.from_numpy(mask),
+                             token_type_ids=self.torch.from_numpy(types))
+        return out.start_logits.float().numpy(), out.end_logits.float().numpy()
+
+    def _best_span(self, start, end, lo, hi):
+        """Highest start+end score with lo <= i <= j < hi and j - i < max_answer_len."""
+        s, e = start[lo:hi], end[lo:hi]
+        scores = s[:, None] + e[None, :]
+        n = len(s)
+        i, j = np.indices((n, n))
+        scores[(j < i) | (j - i >= self.max_answer_len)] = -np.inf
+        flat = int(np.argmax(scores))
+        return flat // n + lo, flat % n + lo, float(scores.flat[flat])
+
+    def answer(self, questions, contexts):
+        """questions[i] is read against every (key, text) in contexts[i]; returns the best span per question."""
+        rows, owners = [], []
+        for qi, (q, ctxs) in enumerate(zip(questions, contexts)):
+            q_ids = np.asarray(self.tok(q, add_special_tokens=False)["input_ids"][:self.max_length // 4], dtype=np.int64)
+            for ci, (key, text) in enumerate(ctxs):
+                c_ids, offsets = self.contexts.get_or_encode(key, text, self._encode_context)
+                if not len(c_ids):
+                    continue
+                for ws, we in self._windows(q_ids, c_ids):
+                    rows.append((q_ids, c_ids[ws:we]))
+                    owners.append((qi, ci, ws, offsets))
+
+        best = [None] * len(questions)
+        for b in range(0, len(rows), self.batch_size):
+            start, end = self._forward(rows[b:b + self.batch_size])
+            for r, (s_log, e_log) in enumerate(zip(start, end)):
+                q_ids, w = rows[b + r]
+                qi, ci, ws, offsets = owners[b + r]
+                lo = len(q_ids) + 2
+                i, j, score = self._best_span(s_log, e_log, lo, lo + len(w))
+                if best[qi] is None or score > best[qi]["score"]:
+                    key, text = contexts[qi][ci]
+                    c0, c1 = offsets[ws + i - lo][0], offsets[ws + j - lo][1]
+                    best[qi] = {"answer": text[c0:c1], "score": score, "context": ci,
+                                "answer_start": int(c0), "answer_end": int(c1)}
+        return best
@@ -1,27 +1,62 @@
-import os, datasets, evaluate
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
+import os, json, hashlib, argparse, datasets, evaluate
+from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer, DataCollatorWithPadding
+from .data import load_splits, source_files
 
 MODEL = "dbmdz/bert-base-turkish-cased"
 DATA = "data/processed/monuments.jsonl"
 OUT  = "runs/cls"
+CACHE = "cache/tokenized"
+MAX_LEN = 512
 
 def load_dataset(path):
-    return datasets.load_dataset("json", data_files={"train": path, "validation": path})
+    return load_splits(path)
 
-def main():
-    ds = load_dataset(DATA)
+def fingerprint(files, model, max_length):
+    """Cache key: content of every source file + tokenizer name + max length."""
+    h = hashlib.sha256(f"{model}|{max_length}|city".encode())
+    for p in files:
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+def encode(ds, tok, max_length, num_proc):
+    """Tokenised, label-encoded DatasetDict with a `length` column, cached on disk by fingerprint."""
+    key = fingerprint(source_files(DATA), MODEL, max_length)
+    path = os.path.join(CACHE, key)
+    if os.path.exists(os.path.join(path, "labels.json")):
+        print(f"[✓] tokenised dataset cache hit -> {path}")
+        return datasets.load_from_disk(path), json.load(open(os.path.join(path, "labels.json"), encoding="utf-8"))
 
     # Demo label: city (replace with your target label)
-    labels = sorted(set([x["city"] for x in ds["train"] if x.get("city")]))
+    labels = sorted(set(c for c in ds["train"]["city"] if c))
     label2id = {l:i for i,l in enumerate(labels)}
-    id2label = {i:l for l,i in label2id.items()}
 
-    tok = AutoTokenizer.from_pretrained(MODEL)
     def tokenize(batch):
-        return tok(batch.get("text_clean",""), truncation=True)
-    ds = ds.map(tokenize, batched=True)
-    ds = ds.filter(lambda x: x.get("city") in label2id)
-    ds = ds.map(lambda x: {"labels": label2id[x["city"]]})
+        x = tok([t or "" for t in batch["text_clean"]], truncation=True, max_length=max_length)
+        x["labels"] = [label2id[c] for c in batch["city"]]
+        x["length"] = [len(ids) for ids in x["input_ids"]]
+        return x
+
+    def prepare(split):
+        split = split.filter(lambda b: [c in label2id for c in b["city"]], batched=True, num_proc=num_proc)
+        return split.map(tokenize, batched=True, num_proc=num_proc, remove_columns=split.column_names)
+
+    train = prepare(ds["train"])
+    # the JSONL fallback hands the same Dataset to both splits; tokenise it only once
+    val = train if ds["validation"] is ds["train"] else prepare(ds["validation"])
+    out = datasets.DatasetDict({"train": train, "validation": val})
+    out.save_to_disk(path)
+    json.dump(labels, open(os.path.join(path, "labels.json"), "w", encoding="utf-8"), ensure_ascii=False)
+    print(f"[✓] tokenised dataset cached -> {path}")
+    return out, labels
+
+def main(max_length=MAX_LEN, num_proc=None):
+    ds = load_dataset(DATA)
+    tok = AutoTokenizer.from_pretrained(MODEL)
+    ds, labels = encode(ds, tok, max_length, num_proc or os.cpu_count())
+    label2id = {l:i for i,l in enumerate(labels)}
+    id2label = {i:l for l,i in label2id.items()}
 
     model = AutoModelForSequenceClassification.from_pretrained(MODEL, num_labels=len(labels), id2label=id2label, label2id=label2id)
 
@@ -45,14 +80,22 @@ def main():
         num_train_epochs=3,
         load_best_model_at_end=True,
         metric_for_best_model="accuracy",
-        report_to="none"
+        report_to="none",
+        group_by_length=True,          # length-grouped sampler: batches of similar length, less padding
+        length_column_name="length",
     )
 
-    tr = Trainer(model=model, args=args, train_dataset=ds["train"], eval_dataset=ds["validation"], tokenizer=tok, compute_metrics=metrics)
+    collator = DataCollatorWithPadding(tok)  # pads each batch to its own longest sequence
+    tr = Trainer(model=model, args=args, train_dataset=ds["train"], eval_dataset=ds["validation"], tokenizer=tok, data_collator=collator, compute_metrics=metrics)
     tr.train()
     tr.save_model(os.path.join(OUT, "best"))
     tok.save_pretrained(os.path.join(OUT, "best"))
     print("[✓] training finished -> runs/cls/best")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--task", default="classify")
+    ap.add_argument("--max-length", type=int, default=MAX_LEN)
+    ap.add_argument("--num-proc", type=int, default=None, help="tokenisation processes on a cache miss (default: all cores)")
+    args = ap.parse_args()
+    main(args.max_length, args.num_proc)
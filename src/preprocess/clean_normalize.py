@@ -1,25 +1,68 @@
-import os, json, yaml, argparse, re
+import os, yaml, argparse, re, time
+from multiprocessing import Pool
+from .jsonio import loads, dumps_line
+
+_WS = re.compile(r"\s+")
 
 def clean_text(t: str) -> str:
     t = (t or "").replace("\u200b", " ")
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _WS.sub(" ", t).strip()
     return t
 
-def main(cfg_path="configs/scraping.yaml"):
+def chunk_ranges(path, chunk_bytes):
+    """(start, end) byte ranges of roughly chunk_bytes, each ending on a line boundary."""
+    size = os.path.getsize(path)
+    ranges, start = [], 0
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def process_chunk(job):
+    path, start, end = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        buf = f.read(end - start)
+    out, n = [], 0
+    for line in buf.splitlines():
+        if not line.strip():
+            continue
+        x = loads(line)
+        x["text_clean"] = clean_text(x.get("description",""))
+        out.append(dumps_line(x))
+        n += 1
+    return b"".join(out), n
+
+def main(cfg_path="configs/scraping.yaml", workers=1, chunk_mb=4.0):
     cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
     inp = cfg["storage"]["detail_jsonl"]
     outp = cfg["storage"]["processed_jsonl"]
     os.makedirs(os.path.dirname(outp), exist_ok=True)
 
-    with open(inp, "r", encoding="utf-8") as fin, open(outp, "w", encoding="utf-8") as fout:
-        for line in fin:
-            x = json.loads(line)
-            x["text_clean"] = clean_text(x.get("description",""))
-            fout.write(json.dumps(x, ensure_ascii=False) + "\n")
-    print(f"[✓] wrote {outp}")
+    jobs = [(inp, s, e) for s, e in chunk_ranges(inp, max(1, int(chunk_mb * 2**20)))]
+    t0, total = time.perf_counter(), 0
+    with open(outp, "wb") as fout:
+        if workers > 1:
+            with Pool(workers) as pool:
+                # imap keeps chunk order, so the output order matches the input
+                for buf, n in pool.imap(process_chunk, jobs):
+                    fout.write(buf)
+                    total += n
+        else:
+            for buf, n in map(process_chunk, jobs):
+                fout.write(buf)
+                total += n
+    dt = time.perf_counter() - t0
+    print(f"[✓] wrote {outp}: {total} records in {dt:.2f}s ({total / max(dt, 1e-9):.0f} rec/s, workers={workers})")
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    ap.add_argument("--chunk-mb", type=float, default=4.0, help="input bytes per worker task")
     args = ap.parse_args()
-    main(args.config)
+    main(args.config, args.workers or os.cpu_count(), args.chunk_mb)
@@ -0,0 +1,153 @@
+import os, yaml, argparse, time, tempfile
+import numpy as np
+from .jsonio import loads, dumps_line
+
+_MAX32 = np.uint64(0xFFFFFFFF)
+_POLY = np.uint64(1000003)
+
+DEFAULTS = {"threshold": 0.8, "num_perm": 128, "bands": 16, "shingle": 5, "batch_shingles": 1 << 15, "max_bucket": 64}
+
+def shingle_hashes(text: str, k: int) -> np.ndarray:
+    """32-bit hashes of every character k-gram of the case-folded text (rolling hash, vectorised)."""
+    cp = np.frombuffer(text.casefold().encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n = len(cp) - k + 1
+    if n <= 0:
+        n, k = 1, len(cp)
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        h = h * _POLY + cp[j:j + n]
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    return np.unique(h & _MAX32)
+
+class MinHasher:
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.RandomState(seed)
+        # multiply-shift universal hashing: (a*x + b) >> 32 with odd 64-bit a, no modulo needed
+        self.a = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def signatures(self, hashes):
+        """(len(hashes), num_perm) uint32 signatures; one broadcast + reduceat for the whole batch."""
+        offsets = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+        flat = np.concatenate(hashes)
+        perm = ((self.a * flat + self.b) >> np.uint64(32)).astype(np.uint32)
+        return np.minimum.reduceat(perm, offsets, axis=1).T
+
+def band_keys(sig: np.ndarray, bands: int) -> np.ndarray:
+    """One uint64 bucket key per (document, band)."""
+    n, p = sig.shape
+    rows = sig.reshape(n, bands, p // bands).astype(np.uint64)
+    key = np.zeros((n, bands), dtype=np.uint64)
+    for r in range(rows.shape[2]):
+        key = key * _POLY + rows[:, :, r]
+    return key
+
+def lsh_pairs(keys: np.ndarray, valid: np.ndarray, max_bucket=64):
+    """Candidate pairs of documents sharing a bucket in any band, via sort instead of dicts.
+
+    Every pair inside a bucket is compared, one lag at a time over the sorted keys
+    (member p against p + lag). Buckets larger than max_bucket only compare members
+    fewer than max_bucket apart, which bounds the cost of a degenerate bucket.
+    """
+    ids = np.flatnonzero(valid)
+    for band in range(keys.shape[1]):
+        k = keys[ids, band]
+        order = np.argsort(k, kind="stable")
+        ks, ds = k[order], ids[order]
+        for lag in range(1, max_bucket):
+            same = ks[lag:] == ks[:-lag]
+            if not same.any():
+                break  # no bucket has more than `lag` members
+            yield ds[:-lag][same], ds[lag:][same]
+
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def cluster(sig, keys, valid, threshold, max_bucket=64):
+    """Union candidate pairs whose estimated Jaccard similarity passes `threshold`; cluster id = smallest member index."""
+    parent = np.arange(len(sig))
+    for a, b in lsh_pairs(keys, valid, max_bucket):
+        if not len(a):
+            continue
+        sim = np.empty(len(a))
+        for s in range(0, len(a), 4096):  # bounded scratch memory for the comparisons
+            sim[s:s + 4096] = (sig[a[s:s + 4096]] == sig[b[s:s + 4096]]).mean(axis=1)
+        for i, j in zip(a[sim >= threshold], b[sim >= threshold]):
+            ri, rj = find(parent, i), find(parent, j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(parent, i) for i in range(len(parent))])
+
+def iter_records(path):
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+def dedup(inp, outp, clusters_path, threshold=0.8, num_perm=128, bands=16, shingle=5, batch_shingles=1 << 15,
+          max_bucket=64):
+    """Near-duplicate removal on text_clean: writes a cluster id per record and keeps the first record of each cluster."""
+    if num_perm % bands:
+        raise ValueError(f"num_perm={num_perm} must be divisible by bands={bands}")
+    n = sum(1 for _ in iter_records(inp))
+    mh = MinHasher(num_perm)
+    with tempfile.TemporaryDirectory() as tmp:
+        # signatures and band keys live in disk-backed arrays, so RAM stays flat as the corpus grows
+        sig = np.lib.format.open_memmap(os.path.join(tmp, "sig.npy"), "w+", np.uint32, (n, num_perm))
+        keys = np.lib.format.open_memmap(os.path.join(tmp, "keys.npy"), "w+", np.uint64, (n, bands))
+        valid = np.zeros(n, dtype=bool)
+
+        batch, start, size = [], 0, 0
+        def flush():
+            nonlocal batch, start, size
+            if batch:
+                s = mh.signatures(batch)
+                sig[start:start + len(batch)] = s
+                keys[start:start + len(batch)] = band_keys(s, bands)
+                start, batch, size = start + len(batch), [], 0
+
+        for i, x in enumerate(iter_records(inp)):
+            text = x.get("text_clean") or ""
+            valid[i] = bool(text)
+            h = shingle_hashes(text, shingle) if text else np.zeros(1, dtype=np.uint64)
+            batch.append(h)
+            size += len(h)
+            if size >= batch_shingles:
+                flush()
+        flush()
+
+        cid = cluster(sig, keys, valid, threshold, max_bucket)
+
+    kept = 0
+    tmp_out = outp + ".tmp"
+    with open(tmp_out, "wb") as fout, open(clusters_path, "wb") as fcl:
+        for i, x in enumerate(iter_records(inp)):
+            c = int(cid[i])
+            fcl.write(dumps_line({"source_url": x.get("source_url"), "cluster_id": c, "duplicate": c != i}))
+            if c == i:
+                x["cluster_id"] = c
+                fout.write(dumps_line(x))
+                kept += 1
+    os.replace(tmp_out, outp)
+    return n, kept
+
+def main(cfg_path="configs/scraping.yaml"):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    params = dict(DEFAULTS, **(cfg.get("dedup") or {}))
+    path = cfg["storage"]["processed_jsonl"]
+    clusters = cfg["storage"].get("clusters_jsonl") or os.path.join(os.path.dirname(path), "clusters.jsonl")
+
+    t0 = time.perf_counter()
+    n, kept = dedup(path, path, clusters, **params)
+    print(f"[✓] dedup {path}: kept {kept}/{n} records ({n - kept} near-duplicates) in {time.perf_counter() - t0:.2f}s; clusters -> {clusters}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    args = ap.parse_args()
+    main(args.config)
@@ -0,0 +1,79 @@
+import os, yaml, argparse, hashlib
+import pyarrow as pa
+from .jsonio import loads
+
+SCHEMA = pa.schema([
+    ("name", pa.string()),
+    ("description", pa.string()),
+    ("city", pa.string()),
+    ("district", pa.string()),
+    ("text_clean", pa.string()),
+    ("source_url", pa.string()),
+    ("last_crawled_at", pa.string()),
+    ("cluster_id", pa.int64()),
+])
+
+def source_stamp(path):
+    """Size + mtime of the source JSONL, stored in the Arrow schema metadata to detect stale splits."""
+    st = os.stat(path)
+    return {"source_size": str(st.st_size), "source_mtime_ns": str(st.st_mtime_ns)}
+
+def read_stamp(arrow_path):
+    """Schema metadata of an exported split (decoded), or {} for files from older exports."""
+    with pa.OSFile(arrow_path, "rb") as f:
+        meta = pa.ipc.open_stream(f).schema.metadata or {}
+    return {k.decode(): v.decode() for k, v in meta.items()}
+
+def split_of(x, val_ratio):
+    """Stable train/validation assignment from the record's URL, independent of file order or size."""
+    key = (x.get("source_url") or x.get("text_clean") or "").encode("utf-8")
+    bucket = int.from_bytes(hashlib.sha1(key).digest()[:8], "big") / 2**64
+    return "validation" if bucket < val_ratio else "train"
+
+def export(inp, out_dir, val_ratio=0.1, batch_rows=10000):
+    """monuments.jsonl -> <out_dir>/{train,validation}.arrow (Arrow IPC stream files, memory-mappable
+    with datasets.Dataset.from_file)."""
+    os.makedirs(out_dir, exist_ok=True)
+    names = SCHEMA.names
+    schema = SCHEMA.with_metadata(dict(source_stamp(inp), validation_ratio=str(val_ratio)))
+    writers, buffers, counts = {}, {}, {}
+    for split in ("train", "validation"):
+        writers[split] = pa.ipc.new_stream(os.path.join(out_dir, f"{split}.arrow"), schema)
+        buffers[split] = {c: [] for c in names}
+        counts[split] = 0
+
+    def flush(split):
+        buf = buffers[split]
+        if buf["name"]:
+            writers[split].write_batch(pa.record_batch([buf[c] for c in names], schema=schema))
+            buffers[split] = {c: [] for c in names}
+
+    with open(inp, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            x = loads(line)
+            split = split_of(x, val_ratio)
+            buf = buffers[split]
+            for c in names:
+                buf[c].append(x.get(c))
+            counts[split] += 1
+            if len(buf["name"]) >= batch_rows:
+                flush(split)
+    for split, w in writers.items():
+        flush(split)
+        w.close()
+    return counts
+
+def main(cfg_path="configs/scraping.yaml"):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    inp = cfg["storage"]["processed_jsonl"]
+    out_dir = cfg["storage"].get("processed_arrow") or os.path.join(os.path.dirname(inp), "arrow")
+    counts = export(inp, out_dir, (cfg.get("split") or {}).get("validation_ratio", 0.1))
+    print(f"[✓] wrote {out_dir}: train={counts['train']} validation={counts['validation']}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    args = ap.parse_args()
+    main(args.config)
@@ -0,0 +1,19 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(s):
+    """Parse one JSON document from str or bytes (orjson when installed)."""
+    return orjson.loads(s) if orjson else json.loads(s)
+
+def dumps_line(x) -> bytes:
+    """One UTF-8 JSONL line, compact and with non-ASCII kept as-is.
+
+    The json fallback uses orjson's separators so both paths write the same bytes.
+    """
+    if orjson:
+        return orjson.dumps(x) + b"\n"
+    return (json.dumps(x, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
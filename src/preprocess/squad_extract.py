@@ -0,0 +1,251 @@
+import os, re, glob, json, yaml, argparse, time, difflib
+from collections import Counter
+from itertools import islice
+from multiprocessing import Pool
+from .jsonio import loads, dumps_line
+
+INPUTS = ("output/output_part_*.json", "output/answers.jsonl")
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_TR_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+MIN_FUZZY = 0.85
+_WORD = re.compile(r"\S+")
+_PUNCT = ".,;:!?\"')"
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """Elements of a top-level JSON array, decoded one at a time from a sliding buffer."""
+    dec = json.JSONDecoder()
+    buf, pos, started = "", 0, False
+    with open(path, "r", encoding="utf-8") as f:
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buf):
+                if buf[pos] != "[":
+                    raise ValueError(f"{path}: not a JSON array")
+                started, pos = True, pos + 1
+                continue
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                obj, end = dec.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    if buf[pos:].strip():
+                        raise
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield obj
+            pos = end
+
+def iter_records(path):
+    """Generation records from an output_part_*.json array or an answers.jsonl file."""
+    if path.endswith(".jsonl"):
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted run
+    else:
+        yield from iter_json_array(path)
+
+def parse_generated(text):
+    """Strip ```json fences and decode the first JSON object in a generated_answer."""
+    text = _FENCE.sub("", (text or "").strip())
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object")
+    return json.JSONDecoder().raw_decode(text[start:])[0]
+
+def fold(s):
+    """Turkish-aware lower case that keeps string length, so offsets carry over to the original."""
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in s.translate(_TR_LOWER))
+
+def find_nearest(hay, needle, near):
+    """Start of the occurrence of needle closest to `near`, or -1."""
+    best, i = -1, hay.find(needle)
+    while i >= 0:
+        if best < 0 or abs(i - near) < abs(best - near):
+            best = i
+        i = hay.find(needle, i + 1)
+    return best
+
+def fuzzy_span(context, text, min_ratio=MIN_FUZZY):
+    """(start, end, ratio) of the context span most similar to text.
+
+    Candidates are word-aligned spans around the longest common block. The start
+    is chosen first (with the end nearest to start + len(text)), then the end for
+    that start, so the cost is linear rather than quadratic in the candidates.
+    """
+    fc, ft = fold(context), fold(text)
+    sm = difflib.SequenceMatcher(None, autojunk=False)
+    sm.set_seqs(fc, ft)
+    m = sm.find_longest_match(0, len(fc), 0, len(ft))
+    if m.size == 0:
+        return None
+    base, slack = m.a - m.b, max(2, len(ft) // 5)
+    words = list(_WORD.finditer(fc))
+    starts = [w.start() for w in words if abs(w.start() - base) <= slack]
+    ends = sorted({w.end() for w in words} | {w.start() + len(w.group().rstrip(_PUNCT)) for w in words})
+    if not starts or not ends:
+        return None
+
+    def score(s, e):
+        sm.set_seq1(fc[s:e])
+        return sm.ratio()
+
+    nearest_end = lambda s: min(ends, key=lambda e: abs(e - s - len(ft)))
+    s = max(starts, key=lambda s: score(s, nearest_end(s)))
+    best = max(((s, e, score(s, e)) for e in ends if e > s and abs(e - s - len(ft)) <= slack),
+               key=lambda x: x[2], default=None)
+    return best if best and best[2] >= min_ratio else None
+
+def locate(context, text, given):
+    """(start, answer_text, how) with context[start:start+len(answer_text)] == answer_text, or None."""
+    given = given if isinstance(given, int) and given >= 0 else 0
+    if context.startswith(text, given):
+        return given, text, "ok"
+    i = find_nearest(context, text, given)
+    if i >= 0:
+        return i, text, "exact"
+    i = find_nearest(fold(context), fold(text), given)
+    if i >= 0:
+        return i, context[i:i + len(text)], "casefold"
+    span = fuzzy_span(context, text)
+    if span:
+        s, e, _ = span
+        return s, context[s:e].strip(), "fuzzy"
+    return None
+
+def row_key(record):
+    """Record identity, as qa_output.row_key: source_url when the row has one (monuments.jsonl), else row_index.
+
+    row_index is only a position in the generation input, so it shifts when the
+    JSONL is rebuilt and repeats across inputs built from different sources.
+    """
+    url = (record.get("row_data") or {}).get("source_url")
+    return url if url else record.get("row_index")
+
+def process(record):
+    """One generation record -> (SQuAD rows, rejects)."""
+    idx, key = record.get("row_index"), row_key(record)
+    context = (record.get("row_data") or {}).get("context")
+    rows, rejects = [], []
+    try:
+        doc = parse_generated(record.get("generated_answer"))
+    except ValueError as e:
+        return rows, [{"row_index": idx, "reason": "bad_json", "detail": str(e)}]
+    context = context or doc.get("context")
+    qas = doc.get("qas")
+    if not context or not isinstance(qas, list):
+        return rows, [{"row_index": idx, "reason": "no_context_or_qas"}]
+    for i, qa in enumerate(qas):
+        q = (qa.get("question") or "").strip() if isinstance(qa, dict) else ""
+        ans = qa.get("answer") if isinstance(qa, dict) else None
+        text = (ans.get("text") or "").strip() if isinstance(ans, dict) else ""
+        if not q or not text:
+            rejects.append({"row_index": idx, "qa": i, "reason": "empty_question_or_answer"})
+            continue
+        hit = locate(context, text, ans.get("answer_start"))
+        if hit is None:
+            rejects.append({"row_index": idx, "qa": i, "reason": "answer_not_in_context", "question": q, "answer": text})
+            continue
+        start, text, how = hit
+        rows.append({
+            "id": f"{key}-{i}", "row_index": idx, "context": context, "question": q,
+            "answers": {"text": [text], "answer_start": [start]}, "repair": how,
+        })
+    return rows, rejects
+
+def batched(it, n):
+    it = iter(it)
+    while batch := list(islice(it, n)):
+        yield batch
+
+def extract(paths, outp, rejects_path, workers=1, batch=512):
+    """Stream every record through process() in fixed-size batches, so memory stays flat regardless of input size."""
+    stats, seen = Counter(), set()
+
+    def records():
+        for path in paths:
+            for r in iter_records(path):
+                key = row_key(r)
+                if key in seen:
+                    stats["duplicate_row"] += 1
+                    continue
+                seen.add(key)
+                yield r
+
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        with open(outp, "wb") as fout, open(rejects_path, "wb") as frej:
+            for chunk in batched(records(), batch):
+                results = pool.map(process, chunk, chunksize=max(1, batch // (4 * workers))) if pool else map(process, chunk)
+                for rows, rejects in results:
+                    stats["records"] += 1
+                    for r in rows:
+                        stats[r["repair"]] += 1
+                        fout.write(dumps_line(r))
+                    for r in rejects:
+                        stats[r["reason"]] += 1
+                        frej.write(dumps_line(r))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return stats
+
+def self_check():
+    """Two sources that share a row_index both keep their QA rows; a repeated source_url is still dropped."""
+    import tempfile
+    answer = lambda ctx: "```json\n" + json.dumps({"qas": [{"question": "Nerede?", "answer": {"text": ctx.split()[0], "answer_start": 0}}]}) + "\n```"
+    rec = lambda url, ctx: {"row_index": 0, "row_data": {"source_url": url, "context": ctx}, "generated_answer": answer(ctx)}
+    with tempfile.TemporaryDirectory() as tmp:
+        part, answers = os.path.join(tmp, "output_part_1.json"), os.path.join(tmp, "answers.jsonl")
+        with open(part, "w", encoding="utf-8") as f:
+            json.dump([rec("https://example.org/a", "Edirne merkezinde bir cami.")], f, ensure_ascii=False)
+        with open(answers, "wb") as f:
+            f.write(dumps_line(rec("https://example.org/b", "Bursa kapalı çarşısı.")))
+            f.write(dumps_line(rec("https://example.org/a", "Edirne merkezinde bir cami.")))
+        outp = os.path.join(tmp, "squad.jsonl")
+        stats = extract([part, answers], outp, os.path.join(tmp, "rejects.jsonl"))
+        with open(outp, "rb") as f:
+            ids = [loads(line)["id"] for line in f]
+    assert stats["records"] == 2 and stats["duplicate_row"] == 1, stats
+    assert ids == ["https://example.org/a-0", "https://example.org/b-0"], ids
+    print("[✓] squad_extract: records are keyed by source_url, not row_index")
+
+def main(cfg_path="configs/scraping.yaml", inputs=INPUTS, workers=1):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    outp = cfg["storage"].get("squad_jsonl", "data/processed/squad.jsonl")
+    rejects = cfg["storage"].get("squad_rejects", os.path.splitext(outp)[0] + "_rejects.jsonl")
+    os.makedirs(os.path.dirname(outp), exist_ok=True)
+    paths = [p for pattern in inputs for p in sorted(glob.glob(pattern))]
+    if not paths:
+        raise SystemExit(f"no inputs match {list(inputs)}")
+
+    t0 = time.perf_counter()
+    stats = extract(paths, outp, rejects, workers)
+    dt = time.perf_counter() - t0
+    kept = stats["ok"] + stats["exact"] + stats["casefold"] + stats["fuzzy"]
+    print(f"[✓] {outp}: {kept} QA pairs from {stats['records']} records in {dt:.2f}s "
+          f"(answer_start ok {stats['ok']}, repaired exact {stats['exact']} / casefold {stats['casefold']} "
+          f"/ fuzzy {stats['fuzzy']}); rejects -> {rejects}: "
+          + ", ".join(f"{k} {stats[k]}" for k in ("bad_json", "no_context_or_qas", "empty_question_or_answer",
+                                                  "answer_not_in_context", "duplicate_row")))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--inputs", nargs="+", default=list(INPUTS), help="output_part_*.json / answers.jsonl globs")
+    ap.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    ap.add_argument("--self-check", action="store_true", help="verify de-duplication by source_url and exit")
+    args = ap.parse_args()
+    if args.self_check:
+        self_check()
+    else:
+        main(args.config, args.inputs, args.workers or os.cpu_count())
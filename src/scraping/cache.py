@@ -0,0 +1,96 @@
+import os, json, gzip, hashlib, threading
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC = "zst" if zstandard else "gz"
+
+def compress(data: bytes, codec: str = CODEC) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("cache entry is zstd-compressed; pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def read_blob(path: str, codec: str) -> str:
+    with open(path, "rb") as f:
+        return decompress(f.read(), codec).decode("utf-8")
+
+class ResponseCache:
+    """Content-addressed store of raw HTML shared by fetch_listing and fetch_detail.
+
+    Bodies live under objects/<sha256[:2]>/<sha256>.<codec>; index.jsonl is an
+    append-only url -> entry log loaded into a dict, so lookups are O(1).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.index = {}
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        e = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.index[e["url"]] = e
+        self._log = open(self.index_path, "a", encoding="utf-8")
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def blob_path(self, entry) -> str:
+        h = entry["sha256"]
+        return os.path.join(self.root, "objects", h[:2], f"{h}.{entry['codec']}")
+
+    def get(self, url):
+        return self.index.get(url)
+
+    def read(self, url):
+        e = self.index.get(url)
+        return read_blob(self.blob_path(e), e["codec"]) if e else None
+
+    def put(self, url: str, text: str, headers=None):
+        body = text.encode("utf-8")
+        headers = headers or {}
+        e = {
+            "url": url,
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "codec": CODEC,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        path = self.blob_path(e)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(compress(body))
+            os.replace(tmp, path)
+        with self.lock:
+            self.index[url] = e
+            self._log.write(json.dumps(e, ensure_ascii=False) + "\n")
+            self._log.flush()
+        return e
+
+    def close(self):
+        self._log.close()
+
+def open_cache(cfg):
+    root = cfg["storage"].get("http_cache")
+    return ResponseCache(root) if root else None
@@ -1,5 +1,12 @@
-import random, time, re
+import random, time, re, threading
 from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+from ..metrics import histogram, counter
+
+STAGE = histogram("kp_crawl_stage_seconds", "Crawler wall time per fetcher and stage (sleep, fetch, parse, parse_pool, write)",
+                  ("fetcher", "stage"))
+HTTP = counter("kp_crawl_http_responses_total", "Crawler HTTP responses per fetcher and status (or exception name)",
+               ("fetcher", "status"))
 
 def polite_sleep(min_s=1.0, max_s=2.0):
     import random, time
@@ -17,3 +24,84 @@ def step(msg: str):
     except Exception as e:
         print(f"[x] {msg} -> {e}", flush=True)
         raise
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for de-duplication: lower-case scheme/host, no default port, fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    scheme, host = parts.scheme.lower(), (parts.hostname or "").lower()
+    port = parts.port
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, parts.query, ""))
+
+class TokenBucket:
+    """Thread-safe token bucket; each refill interval is drawn from [min_s, max_s]."""
+
+    def __init__(self, min_s=1.0, max_s=2.0, burst=1):
+        self.min_s, self.max_s, self.burst = min_s, max_s, max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.interval = random.uniform(min_s, max_s)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        while self.tokens < self.burst and now - self.stamp >= self.interval:
+            self.stamp += self.interval
+            self.tokens += 1
+            self.interval = random.uniform(self.min_s, self.max_s)
+        if self.tokens >= self.burst:
+            self.stamp = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = self.interval - (now - self.stamp)
+            time.sleep(max(wait, 0.0))
+
+class HostRateLimiter:
+    """One shared TokenBucket per host, so concurrent workers still respect the crawl rate."""
+
+    def __init__(self, min_s=1.0, max_s=2.0, burst=1):
+        self.min_s, self.max_s, self.burst = min_s, max_s, burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.min_s, self.max_s, self.burst)
+        bucket.acquire()
+
+def rate_limiter(cfg):
+    return HostRateLimiter(cfg["rate_seconds_min"], cfg["rate_seconds_max"], cfg.get("rate_burst", 1))
+
+def fetch(session, limiter, url, fetcher, **kw):
+    """Rate-limited session.get with sleep/fetch timings and the response status counted per fetcher."""
+    with STAGE.time(fetcher, "sleep"):
+        limiter.acquire(url)
+    with STAGE.time(fetcher, "fetch"):
+        try:
+            r = session.get(url, **kw)
+        except Exception as e:
+            HTTP.inc(fetcher, type(e).__name__)
+            raise
+    HTTP.inc(fetcher, str(r.status_code))
+    return r
+
+def make_session(cfg, pool_size=1):
+    import requests
+    from requests.adapters import HTTPAdapter
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers["User-Agent"] = cfg["user_agent"]
+    return s
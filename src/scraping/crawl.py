@@ -0,0 +1,88 @@
+import os, json, yaml, argparse, queue, threading
+from .common import step, make_session, rate_limiter, STAGE
+from ..metrics import collect
+from .cache import open_cache
+from .fetch_listing import iter_listing
+from .fetch_detail import crawl_urls, open_state, unique_pending, compact
+
+_DONE = object()
+
+def crawl(cfg, concurrency=None, resume=False, max_age_hours=None):
+    """Listing and detail in one pass: detail URLs stream through a bounded queue
+    while listing pages are still being fetched.
+
+    Both stages share one per-host rate limiter, so the combined request rate
+    still respects rate_seconds_min/max. listing.jsonl and detail.jsonl are
+    written in the same format as the separate fetchers.
+    """
+    listing_path = cfg["storage"]["listing_jsonl"]
+    detail_path = cfg["storage"]["detail_jsonl"]
+    concurrency = max(1, concurrency or cfg.get("concurrency", 1))
+    if max_age_hours is None:
+        max_age_hours = cfg.get("recrawl_after_hours")
+    for p in (listing_path, detail_path):
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+
+    limiter = rate_limiter(cfg)
+    urls = queue.Queue(maxsize=cfg.get("queue_size", 4 * concurrency))
+    failure = []
+    stop = threading.Event()  # set when the detail side exits, so a full queue can't block the producer forever
+
+    def offer(x):
+        while not stop.is_set():
+            try:
+                urls.put(x, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        session, cache = make_session(cfg), open_cache(cfg)
+        try:
+            with open(listing_path, "w", encoding="utf-8") as fout:
+                for item in iter_listing(cfg, session, limiter, cache):
+                    with STAGE.time("listing", "write"):
+                        fout.write(json.dumps(item, ensure_ascii=False) + "\n")
+                        fout.flush()
+                    if not offer(item["url"]):
+                        break
+        except Exception as e:
+            failure.append(e)
+        finally:
+            offer(_DONE)
+            session.close()
+            if cache is not None:
+                cache.close()
+
+    state, todo = open_state(detail_path, resume, max_age_hours)
+    mode = "a" if resume else "w"
+    with step(f"crawl -> {listing_path}, {detail_path} (concurrency={concurrency}, resume={resume})"):
+        producer = threading.Thread(target=produce, name="listing", daemon=True)
+        producer.start()
+        try:
+            with open(detail_path, mode, encoding="utf-8") as fout:
+                crawl_urls(unique_pending(iter(urls.get, _DONE), state, todo), cfg, fout, concurrency, todo, limiter)
+        finally:
+            stop.set()
+            producer.join()
+        if failure:
+            raise failure[0]
+        if resume:
+            print(f"[i] {compact(detail_path)} unique records in {detail_path}", flush=True)
+
+def main(cfg_path="configs/scraping.yaml", concurrency=None, resume=False, max_age_hours=None, metrics=None, profile=None):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    with collect(metrics, profile):
+        crawl(cfg, concurrency, resume, max_age_hours)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--concurrency", type=int, default=None, help="detail requests in flight (default: cfg concurrency)")
+    ap.add_argument("--resume", action="store_true", help="keep existing detail records, fetch only new/stale URLs")
+    ap.add_argument("--max-age-hours", type=float, default=None, help="re-validate records older than this (default: cfg recrawl_after_hours)")
+    ap.add_argument("--metrics", help="write stage timings and HTTP status counts here (Prometheus text)")
+    ap.add_argument("--profile", help="sample stacks during the run and write them here (collapsed format)")
+    args = ap.parse_args()
+    main(args.config, args.concurrency, args.resume, args.max_age_hours, args.metrics, args.profile)
@@ -0,0 +1,143 @@
+import sys, time, argparse, yaml
+from urllib.parse import urljoin
+from .common import clean_ws, normalize_url
+
+_SKIP_TEXT = {"script", "style", "template"}  # bs4 get_text() leaves these out too
+
+def _strings(el):
+    """Text nodes under `el` in document order, like bs4's Tag._all_strings()."""
+    if el.text:
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT:
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+def text_of(el, sep=""):
+    return clean_ws(sep.join(_strings(el)))
+
+class Bs4Extractor:
+    """Reference backend: the original BeautifulSoup code path."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+    def detail(self, html):
+        from bs4 import BeautifulSoup
+        from .fetch_detail import parse_detail
+        return parse_detail(BeautifulSoup(html, "lxml"), self.cfg["selectors"])
+
+    def listing(self, html):
+        from bs4 import BeautifulSoup
+        from .fetch_listing import parse_listing
+        return parse_listing(BeautifulSoup(html, "lxml"), self.cfg)
+
+class LxmlExtractor:
+    """lxml.html with every selector compiled to XPath once; output matches Bs4Extractor."""
+
+    def __init__(self, cfg):
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+        self.cfg = cfg
+        self.parser = lxml.html.HTMLParser(encoding="utf-8")
+        self.fromstring = lxml.html.document_fromstring
+        sel = cfg["selectors"]
+        compile_ = lambda s: CSSSelector(s, translator="html") if s else None
+        self.detail_sel = {k: compile_(sel[f"detail_{k}"]) for k in ("title", "content", "city", "district")}
+        self.card_sel = compile_(sel["listing_card"])
+        self.card_title_sel = compile_(sel.get("listing_title", ""))
+
+    def _root(self, html):
+        from lxml.etree import ParserError
+        try:
+            return self.fromstring(html.encode("utf-8"), parser=self.parser)
+        except ParserError:  # empty document
+            return None
+
+    @staticmethod
+    def _first(sel, el, self_ok=False):
+        # CSSSelector matches descendant-or-self; bs4 Tag.select_one only looks at descendants
+        for m in sel(el):
+            if self_ok or m is not el:
+                return m
+        return None
+
+    def detail(self, html):
+        root = self._root(html)
+        el = {k: self._first(s, root, True) if root is not None else None for k, s in self.detail_sel.items()}
+        return {
+            "name": text_of(el["title"]) if el["title"] is not None else None,
+            "description": text_of(el["content"], " ") if el["content"] is not None else None,
+            "city": text_of(el["city"]) if el["city"] is not None else None,
+            "district": text_of(el["district"]) if el["district"] is not None else None,
+        }
+
+    def listing(self, html):
+        root = self._root(html)
+        if root is None:
+            return []
+        base = self.cfg["base_url"]
+        items = []
+        for a in self.card_sel(root):
+            href = a.get("href") or ""
+            title_el = self._first(self.card_title_sel, a) if self.card_title_sel is not None else None
+            title = text_of(title_el) if title_el is not None else text_of(a)
+            if href:
+                items.append({"title": title, "url": normalize_url(urljoin(base, href))})
+        return items
+
+BACKENDS = {"bs4": Bs4Extractor, "lxml": LxmlExtractor}
+_extractors = {}
+
+def get_extractor(cfg, backend=None):
+    """Per-process memo, so selectors are compiled once per worker rather than once per page."""
+    backend = backend or cfg.get("extract_backend", "bs4")
+    key = (backend, cfg["base_url"], tuple(sorted(cfg["selectors"].items())))
+    ex = _extractors.get(key)
+    if ex is None:
+        ex = _extractors[key] = BACKENDS[backend](cfg)
+    return ex
+
+def extract_detail(html, cfg):
+    return get_extractor(cfg).detail(html)
+
+def extract_listing(html, cfg):
+    return get_extractor(cfg).listing(html)
+
+def bench(cfg, pages, repeat=20):
+    """pages/s for every backend over the same HTML, plus a field-by-field parity check."""
+    results, outputs = {}, {}
+    for name in BACKENDS:
+        ex = get_extractor(cfg, name)
+        outputs[name] = [ex.detail(h) for h in pages]
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for h in pages:
+                ex.detail(h)
+        results[name] = repeat * len(pages) / (time.perf_counter() - t0)
+    mismatches = sum(a != b for a, b in zip(outputs["bs4"], outputs["lxml"]))
+    return results, mismatches
+
+def main(cfg_path="configs/scraping.yaml", html_paths=(), limit=200, repeat=20):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    pages = [open(p, "r", encoding="utf-8").read() for p in html_paths]
+    if not pages:
+        from .cache import open_cache
+        cache = open_cache(cfg)
+        if cache is None:
+            sys.exit("no --html files given and storage.http_cache is not configured")
+        pages = [cache.read(url) for url in list(cache.index)[:limit]]
+    results, mismatches = bench(cfg, pages, repeat)
+    for name, pps in results.items():
+        print(f"{name:5s} {pps:10.1f} pages/s")
+    print(f"speed-up lxml/bs4: {results['lxml'] / results['bs4']:.2f}x, mismatching pages: {mismatches}/{len(pages)}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="micro-benchmark of the detail extraction backends")
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--html", nargs="*", default=[], help="HTML files (default: pages from the response cache)")
+    ap.add_argument("--limit", type=int, default=200, help="max cached pages to use")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    main(args.config, args.html, args.limit, args.repeat)
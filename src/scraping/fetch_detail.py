@@ -1,8 +1,12 @@
-import os, json, yaml, requests
-from bs4 import BeautifulSoup
+import os, json, yaml, argparse
+from collections import Counter
 from tqdm import tqdm
-from datetime import datetime, timezone
-from .common import polite_sleep, step, clean_ws
+from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from .common import step, clean_ws, normalize_url, make_session, rate_limiter, fetch, STAGE
+from ..metrics import collect
+from .cache import open_cache, read_blob
+from .extract import extract_detail
 
 def parse_detail(soup, sel):
     title_el = soup.select_one(sel["detail_title"])
@@ -17,32 +21,228 @@ def parse_detail(soup, sel):
         "district": clean_ws(district_el.get_text()) if district_el else None,
     }
 
-def fetch_detail(cfg):
+def build_record(html, url, cfg, crawled_at, etag=None, last_modified=None, parse_pool=None):
+    if parse_pool is not None:
+        # the worker process can't report into this registry: the stage is queue wait + parse + pickling
+        with STAGE.time("detail", "parse_pool"):
+            data = parse_pool.submit(extract_detail, html, cfg).result()
+    else:
+        with STAGE.time("detail", "parse"):
+            data = extract_detail(html, cfg)
+    data.update({
+        "source_url": url,
+        "last_crawled_at": crawled_at,
+        "etag": etag,
+        "last_modified": last_modified,
+    })
+    return data
+
+def load_state(path):
+    """Last record per source_url from an existing detail.jsonl (later lines win)."""
+    state = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    x = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                if x.get("source_url"):
+                    state[x["source_url"]] = x
+    return state
+
+def is_stale(rec, max_age_hours):
+    if max_age_hours is None:
+        return False
+    try:
+        crawled = datetime.fromisoformat(rec["last_crawled_at"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return datetime.now(timezone.utc) - crawled > timedelta(hours=max_age_hours)
+
+def open_state(out_path, resume, max_age_hours):
+    """(state, todo) for a run: every known record, and the stale ones to re-validate."""
+    if not resume:
+        return {}, {}
+    if os.path.exists(out_path) and os.path.getsize(out_path):
+        with open(out_path, "rb+") as f:  # terminate a torn last line before appending
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    state = load_state(out_path)
+    return state, {url: rec for url, rec in state.items() if is_stale(rec, max_age_hours)}
+
+def unique_pending(urls, state, todo):
+    """Normalised URLs not yet seen in this run that are new or stale."""
+    seen = set()
+    for url in urls:
+        url = normalize_url(url)
+        if url in seen:
+            continue
+        seen.add(url)
+        if url not in state or url in todo:
+            yield url
+
+def compact(path):
+    """Rewrite detail.jsonl keeping only the latest record per source_url."""
+    state = load_state(path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for rec in state.values():
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+    return len(state)
+
+def fetch_one(session, limiter, url, cfg, prev=None, cache=None, parse_pool=None):
+    cached = cache.get(url) if cache is not None else None
+    validators = prev or cached or {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    r = fetch(session, limiter, url, "detail", timeout=cfg["timeout_seconds"], headers=headers)
+    now = datetime.now(timezone.utc).isoformat()
+    if r.status_code == 304:
+        if prev:
+            return dict(prev, last_crawled_at=now)
+        if cached:
+            return build_record(cache.read(url), url, cfg, now, cached["etag"], cached["last_modified"], parse_pool)
+        return None
+    if r.status_code != 200:
+        return None
+    if cache is not None:
+        with STAGE.time("detail", "write"):
+            cache.put(url, r.text, r.headers)
+    return build_record(r.text, url, cfg, now, r.headers.get("ETag"), r.headers.get("Last-Modified"), parse_pool)
+
+def crawl_urls(urls, cfg, fout, concurrency=1, state=None, limiter=None):
+    """Fetch `urls` with up to `concurrency` requests in flight and write records to `fout`.
+
+    All workers share one pooled session and one per-host token bucket, so the
+    request rate is still capped by rate_seconds_min/max. URLs found in `state`
+    (or in the response cache) are re-validated with a conditional GET. With
+    cfg parse_workers > 0, HTML is parsed in a process pool off the fetch threads.
+    A URL whose fetch or parse raises is logged and skipped (no record is written,
+    so --resume retries it); returns the number of such failures.
+    """
+    state = state or {}
+    cache = open_cache(cfg)
+    session = make_session(cfg, concurrency)
+    limiter = limiter or rate_limiter(cfg)
+    parse_workers = cfg.get("parse_workers", 0)
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers else None
+    bar = tqdm(desc="detail")
+    url_of, errors = {}, Counter()
+
+    def drain(done):
+        for fut in done:
+            url = url_of.pop(fut)
+            try:
+                data = fut.result()
+            except Exception as e:
+                errors[type(e).__name__] += 1
+                tqdm.write(f"[!] {url} -> {type(e).__name__}: {e}")
+                data = None
+            if data is not None:
+                with STAGE.time("detail", "write"):
+                    fout.write(json.dumps(data, ensure_ascii=False) + "\n")
+                    fout.flush()
+            bar.update()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        for url in urls:
+            fut = pool.submit(fetch_one, session, limiter, url, cfg, state.get(url), cache, parse_pool)
+            url_of[fut] = url
+            pending.add(fut)
+            if len(pending) >= 2 * concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(done)
+        drain(pending)
+    bar.close()
+    session.close()
+    if parse_pool is not None:
+        parse_pool.shutdown()
+    if cache is not None:
+        cache.close()
+    failed = sum(errors.values())
+    if failed:
+        print(f"[!] {failed} detail URL(s) failed ({', '.join(f'{k} {n}' for k, n in errors.most_common())}); "
+              "--resume fetches them again", flush=True)
+    return failed
+
+def _replay_one(job):
+    url, path, entry, cfg = job
+    html = read_blob(path, entry["codec"])
+    return build_record(html, url, cfg, entry["fetched_at"], entry["etag"], entry["last_modified"])
+
+def replay_detail(cfg, workers=None):
+    """Rebuild detail.jsonl from the response cache only (no network), parsing on all cores."""
+    cache = open_cache(cfg)
+    if cache is None:
+        raise ValueError("replay needs storage.http_cache in the config")
     in_path = cfg["storage"]["listing_jsonl"]
     out_path = cfg["storage"]["detail_jsonl"]
-    headers = {"User-Agent": cfg["user_agent"]}
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
-    with step(f"detail from {in_path} -> {out_path}"):
-        with open(in_path, "r", encoding="utf-8") as fin, open(out_path, "w", encoding="utf-8") as fout:
-            for line in tqdm(fin, desc="detail"):
-                item = json.loads(line)
-                url = item["url"]
-                r = requests.get(url, timeout=cfg["timeout_seconds"], headers=headers)
-                if r.status_code != 200:
-                    continue
-                soup = BeautifulSoup(r.text, "lxml")
-                data = parse_detail(soup, cfg["selectors"])
-                data.update({
-                    "source_url": url,
-                    "last_crawled_at": datetime.now(timezone.utc).isoformat()
-                })
+    def jobs(fin):
+        for line in fin:
+            url = json.loads(line)["url"]
+            e = cache.get(url)
+            if e:
+                yield url, cache.blob_path(e), e, cfg
+
+    with step(f"replay detail from {cache.root} -> {out_path}"):
+        with open(in_path, "r", encoding="utf-8") as fin, open(out_path, "w", encoding="utf-8") as fout, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            for data in tqdm(pool.map(_replay_one, jobs(fin), chunksize=32), desc="replay"):
                 fout.write(json.dumps(data, ensure_ascii=False) + "\n")
-                polite_sleep(cfg["rate_seconds_min"], cfg["rate_seconds_max"])
+    cache.close()
+
+def fetch_detail(cfg, concurrency=None, resume=False, max_age_hours=None):
+    """Crawl every listing URL into detail.jsonl.
+
+    With `resume`, records already in detail.jsonl are kept and only missing
+    URLs, or ones older than `max_age_hours` (default cfg recrawl_after_hours),
+    are fetched; stale ones are re-validated with If-None-Match/If-Modified-Since
+    and a 304 just refreshes last_crawled_at.
+    """
+    in_path = cfg["storage"]["listing_jsonl"]
+    out_path = cfg["storage"]["detail_jsonl"]
+    concurrency = max(1, concurrency or cfg.get("concurrency", 1))
+    if max_age_hours is None:
+        max_age_hours = cfg.get("recrawl_after_hours")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+    state, todo = open_state(out_path, resume, max_age_hours)
+    mode = "a" if resume else "w"
+    with step(f"detail from {in_path} -> {out_path} (concurrency={concurrency}, resume={resume})"):
+        with open(in_path, "r", encoding="utf-8") as fin, open(out_path, mode, encoding="utf-8") as fout:
+            urls = unique_pending((json.loads(line)["url"] for line in fin), state, todo)
+            crawl_urls(urls, cfg, fout, concurrency, todo)
+        if resume:
+            print(f"[i] {compact(out_path)} unique records in {out_path}", flush=True)
 
-def main(cfg_path="configs/scraping.yaml"):
+def main(cfg_path="configs/scraping.yaml", concurrency=None, resume=False, max_age_hours=None, replay=False, workers=None,
+         metrics=None, profile=None):
     cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
-    fetch_detail(cfg)
+    with collect(metrics, profile):
+        if replay:
+            replay_detail(cfg, workers)
+        else:
+            fetch_detail(cfg, concurrency, resume, max_age_hours)
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--concurrency", type=int, default=None, help="requests in flight (default: cfg concurrency)")
+    ap.add_argument("--resume", action="store_true", help="keep existing records, fetch only new/stale URLs")
+    ap.add_argument("--max-age-hours", type=float, default=None, help="re-validate records older than this (default: cfg recrawl_after_hours)")
+    ap.add_argument("--replay", action="store_true", help="re-parse cached HTML only, no network")
+    ap.add_argument("--workers", type=int, default=None, help="parser processes for --replay (default: all cores)")
+    ap.add_argument("--metrics", help="write stage timings and HTTP status counts here (Prometheus text)")
+    ap.add_argument("--profile", help="sample stacks during the run and write them here (collapsed format)")
+    args = ap.parse_args()
+    main(args.config, args.concurrency, args.resume, args.max_age_hours, args.replay, args.workers, args.metrics, args.profile)
@@ -1,39 +1,111 @@
-import os, json, requests, yaml
-from bs4 import BeautifulSoup
+import os, json, yaml, argparse
 from urllib.parse import urljoin
 from tqdm import trange
-from .common import polite_sleep, step, clean_ws
+from concurrent.futures import ProcessPoolExecutor
+from .common import step, clean_ws, normalize_url, make_session, rate_limiter, fetch, STAGE
+from ..metrics import collect
+from .cache import open_cache, read_blob
+from .extract import extract_listing
 
-def fetch_listing(cfg):
+def parse_listing(soup, cfg):
     base = cfg["base_url"]
-    path_tpl = cfg["paths"]["listing"]
+    items = []
+    for a in soup.select(cfg["selectors"]["listing_card"]):
+        href = a.get("href") or ""
+        title_el = a.select_one(cfg["selectors"].get("listing_title",""))
+        title = clean_ws(title_el.get_text()) if title_el else clean_ws(a.get_text())
+        if href:
+            items.append({"title": title, "url": normalize_url(urljoin(base, href))})
+    return items
+
+def page_url(cfg, page):
+    return urljoin(cfg["base_url"], cfg["paths"]["listing"].format(page=page))
+
+def fetch_page(session, limiter, cfg, page, cache=None):
+    """Cards of one listing page, or None when the listing is exhausted."""
+    url = page_url(cfg, page)
+    r = fetch(session, limiter, url, "listing", timeout=cfg["timeout_seconds"])
+    if r.status_code != 200:
+        return None
+    if cache is not None:
+        with STAGE.time("listing", "write"):
+            cache.put(url, r.text, r.headers)
+    with STAGE.time("listing", "parse"):
+        return extract_listing(r.text, cfg) or None
+
+def iter_listing(cfg, session, limiter, cache=None):
+    """Yield unique listing items page by page; URLs repeated on later pages are dropped."""
+    seen = set()
+    for page in trange(1, cfg["max_pages"]+1, desc="listing"):
+        items = fetch_page(session, limiter, cfg, page, cache)
+        if not items:
+            break
+        for item in items:
+            if item["url"] not in seen:
+                seen.add(item["url"])
+                yield item
+
+def fetch_listing(cfg):
     out_path = cfg["storage"]["listing_jsonl"]
-    headers = {"User-Agent": cfg["user_agent"]}
+    session = make_session(cfg)
+    limiter = rate_limiter(cfg)
+    cache = open_cache(cfg)
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
     with step(f"write listing -> {out_path}"):
         with open(out_path, "w", encoding="utf-8") as fout:
-            for page in trange(1, cfg["max_pages"]+1, desc="listing"):
-                url = urljoin(base, path_tpl.format(page=page))
-                r = requests.get(url, timeout=cfg["timeout_seconds"], headers=headers)
-                if r.status_code != 200:
-                    break
-                soup = BeautifulSoup(r.text, "lxml")
-                cards = soup.select(cfg["selectors"]["listing_card"])
-                if not cards:
+            for item in iter_listing(cfg, session, limiter, cache):
+                with STAGE.time("listing", "write"):
+                    fout.write(json.dumps(item, ensure_ascii=False) + "\n")
+    session.close()
+    if cache is not None:
+        cache.close()
+
+def _replay_page(job):
+    path, codec, cfg = job
+    return extract_listing(read_blob(path, codec), cfg)
+
+def replay_listing(cfg, workers=None):
+    """Rebuild listing.jsonl from cached listing pages only (no network), parsing on all cores."""
+    cache = open_cache(cfg)
+    if cache is None:
+        raise ValueError("replay needs storage.http_cache in the config")
+    out_path = cfg["storage"]["listing_jsonl"]
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+    jobs = []
+    for page in range(1, cfg["max_pages"]+1):
+        e = cache.get(page_url(cfg, page))
+        if e is None:
+            break
+        jobs.append((cache.blob_path(e), e["codec"], cfg))
+
+    seen = set()
+    with step(f"replay listing from {cache.root} ({len(jobs)} pages) -> {out_path}"):
+        with open(out_path, "w", encoding="utf-8") as fout, ProcessPoolExecutor(max_workers=workers) as pool:
+            for items in pool.map(_replay_page, jobs):
+                if not items:
                     break
-                for a in cards:
-                    href = a.get("href") or ""
-                    title_el = a.select_one(cfg["selectors"].get("listing_title",""))
-                    title = clean_ws(title_el.get_text()) if title_el else clean_ws(a.get_text())
-                    if href:
-                        item = {"title": title, "url": urljoin(base, href)}
+                for item in items:
+                    if item["url"] not in seen:
+                        seen.add(item["url"])
                         fout.write(json.dumps(item, ensure_ascii=False) + "\n")
-                polite_sleep(cfg["rate_seconds_min"], cfg["rate_seconds_max"])
+    cache.close()
 
-def main(cfg_path="configs/scraping.yaml"):
+def main(cfg_path="configs/scraping.yaml", replay=False, workers=None, metrics=None, profile=None):
     cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
-    fetch_listing(cfg)
+    with collect(metrics, profile):
+        if replay:
+            replay_listing(cfg, workers)
+        else:
+            fetch_listing(cfg)
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--replay", action="store_true", help="re-parse cached listing pages only, no network")
+    ap.add_argument("--workers", type=int, default=None, help="parser processes for --replay (default: all cores)")
+    ap.add_argument("--metrics", help="write stage timings and HTTP status counts here (Prometheus text)")
+    ap.add_argument("--profile", help="sample stacks during the run and write them here (collapsed format)")
+    args = ap.parse_args()
+    main(args.config, args.replay, args.workers, args.metrics, args.profile)
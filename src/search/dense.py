@@ -0,0 +1,166 @@
+import os, json, yaml, argparse, time
+import numpy as np
+from ..preprocess.jsonio import loads, dumps_line
+
+EMBED_MODEL = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
+INDEX_DIR = "data/index/dense"
+META_FIELDS = ("source_url", "name", "city", "district")
+
+class Encoder:
+    """Mean-pooled, L2-normalised sentence embeddings from a HF encoder."""
+
+    def __init__(self, model_name=EMBED_MODEL, max_length=256):
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+        self.torch = torch
+        self.tok = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.max_length = max_length
+        self.dim = self.model.config.hidden_size
+
+    def encode(self, texts, batch_size=64):
+        texts = list(texts)
+        order = np.argsort([len(t) for t in texts], kind="stable")  # similar lengths per batch, less padding
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        with self.torch.inference_mode():
+            for s in range(0, len(texts), batch_size):
+                idx = order[s:s + batch_size]
+                x = self.tok([texts[i] for i in idx], padding=True, truncation=True,
+                             max_length=self.max_length, return_tensors="pt")
+                h = self.model(**x).last_hidden_state
+                m = x["attention_mask"].unsqueeze(-1).to(h.dtype)
+                v = (h * m).sum(1) / m.sum(1).clamp(min=1e-9)
+                out[idx] = self.torch.nn.functional.normalize(v, dim=-1).numpy()
+        return out
+
+def kmeans(x, k, iters=10, seed=0):
+    """Spherical k-means on unit vectors (cosine), enough for an IVF coarse quantiser."""
+    rng = np.random.default_rng(seed)
+    c = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(x @ c.T, axis=1)
+        for j in range(k):
+            members = x[assign == j]
+            if len(members):
+                v = members.sum(0)
+                c[j] = v / max(np.linalg.norm(v), 1e-9)
+    return c
+
+def assign_lists(mm, centroids, chunk=8192):
+    return np.concatenate([np.argmax(np.asarray(mm[s:s + chunk], dtype=np.float32) @ centroids.T, axis=1)
+                           for s in range(0, len(mm), chunk)])
+
+def build(inp, out_dir, model_name=EMBED_MODEL, batch_size=64, max_length=256, ivf_lists=0, chunk=4096):
+    """Encode every text_clean into a float16 memmap; optional IVF reorders rows so each list is contiguous."""
+    os.makedirs(out_dir, exist_ok=True)
+    enc = Encoder(model_name, max_length)
+    with open(inp, "rb") as f:
+        n = sum(1 for line in f if line.strip())
+
+    raw_path = os.path.join(out_dir, "embeddings.tmp.f16")
+    raw = np.memmap(raw_path, dtype=np.float16, mode="w+", shape=(max(n, 1), enc.dim))
+    meta = []
+    texts, start = [], 0
+    with open(inp, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            x = loads(line)
+            meta.append({k: x.get(k) for k in META_FIELDS})
+            texts.append(x.get("text_clean") or x.get("name") or "")
+            if len(texts) >= chunk:
+                raw[start:start + len(texts)] = enc.encode(texts, batch_size)
+                start, texts = start + len(texts), []
+    if texts:
+        raw[start:start + len(texts)] = enc.encode(texts, batch_size)
+    raw.flush()
+
+    if ivf_lists == 0:
+        ivf_lists = int(np.sqrt(n)) if n > 20000 else -1
+    order, offsets = np.arange(n), None
+    if ivf_lists > 0:
+        rng = np.random.default_rng(0)
+        sample = np.asarray(raw[np.sort(rng.choice(n, min(n, 50 * ivf_lists), replace=False))], dtype=np.float32)
+        centroids = kmeans(sample, ivf_lists)
+        lists = assign_lists(raw, centroids)
+        order = np.argsort(lists, kind="stable")
+        offsets = np.searchsorted(lists[order], np.arange(ivf_lists + 1))
+        np.save(os.path.join(out_dir, "ivf_centroids.npy"), centroids.astype(np.float32))
+        np.save(os.path.join(out_dir, "ivf_offsets.npy"), offsets)
+
+    emb = np.memmap(os.path.join(out_dir, "embeddings.f16"), dtype=np.float16, mode="w+", shape=(max(n, 1), enc.dim))
+    for s in range(0, n, chunk):
+        emb[s:s + chunk] = raw[order[s:s + chunk]]
+    emb.flush()
+    del raw, emb
+    os.remove(raw_path)
+    with open(os.path.join(out_dir, "meta.jsonl"), "wb") as f:
+        for i in order:
+            f.write(dumps_line(meta[i]))
+    info = {"count": n, "dim": enc.dim, "model": model_name, "max_length": max_length,
+            "ivf_lists": max(ivf_lists, 0)}
+    json.dump(info, open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8"), indent=2)
+    return info
+
+class DenseIndex:
+    """Read side: memory-mapped float16 matrix, brute-force or IVF top-k by inner product."""
+
+    def __init__(self, path=INDEX_DIR, in_memory=None):
+        self.path = path
+        self.info = json.load(open(os.path.join(path, "index.json"), encoding="utf-8"))
+        n, d = self.info["count"], self.info["dim"]
+        self.emb = np.memmap(os.path.join(path, "embeddings.f16"), dtype=np.float16, mode="r", shape=(max(n, 1), d))[:n]
+        with open(os.path.join(path, "meta.jsonl"), "rb") as f:
+            self.meta = [loads(line) for line in f]
+        self.ivf = self.info["ivf_lists"] > 0
+        if self.ivf:
+            self.centroids = np.load(os.path.join(path, "ivf_centroids.npy"))
+            self.offsets = np.load(os.path.join(path, "ivf_offsets.npy"))
+        # a flat scan needs float32 for BLAS; keep one converted copy instead of converting per query
+        if in_memory or (in_memory is None and not self.ivf):
+            self.emb = np.asarray(self.emb, dtype=np.float32)
+        self.encoder = None
+
+    def __len__(self):
+        return len(self.meta)
+
+    def query_vector(self, text):
+        if self.encoder is None:
+            self.encoder = Encoder(self.info["model"], self.info["max_length"])
+        return self.encoder.encode([text])[0]
+
+    def search_vector(self, q, k=10, nprobe=8):
+        q = np.asarray(q, dtype=np.float32)
+        if self.ivf:
+            lists = np.argsort(-(self.centroids @ q))[:nprobe]
+            ids = np.concatenate([np.arange(self.offsets[j], self.offsets[j + 1]) for j in lists])
+            scores = np.asarray(self.emb[ids], dtype=np.float32) @ q
+        else:
+            ids = None
+            scores = self.emb @ q
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = ids[top] if ids is not None else top
+        return [dict(self.meta[r], score=float(scores[t])) for r, t in zip(rows, top)]
+
+    def search(self, text, k=10, nprobe=8):
+        return self.search_vector(self.query_vector(text), k, nprobe)
+
+def main(cfg_path="configs/scraping.yaml"):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    sc = cfg.get("search") or {}
+    out_dir = sc.get("dense_index", INDEX_DIR)
+    t0 = time.perf_counter()
+    info = build(cfg["storage"]["processed_jsonl"], out_dir, sc.get("embed_model", EMBED_MODEL),
+                 sc.get("batch_size", 64), sc.get("max_length", 256), sc.get("ivf_lists", 0))
+    print(f"[✓] dense index {out_dir}: {info['count']} x {info['dim']} float16, "
+          f"ivf_lists={info['ivf_lists']} in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    args = ap.parse_args()
+    main(args.config)
@@ -0,0 +1,183 @@
+import os, re, json, math, yaml, argparse, time, hashlib, unicodedata
+import numpy as np
+from ..preprocess.jsonio import loads, dumps_line
+
+try:
+    from unidecode import unidecode
+except ImportError:
+    unidecode = None
+
+INDEX_DIR = "data/index/lexical"
+FIELDS = {"name": 2.0, "city": 1.0, "district": 1.0, "text_clean": 1.0}  # field -> tf weight
+META_FIELDS = ("source_url", "name", "city", "district")
+_TOKEN = re.compile(r"\w+")
+_TR_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+
+def normalize(text, ascii_fold=False, stem_prefix=0):
+    """Turkish casefold (I->ı, İ->i before lower()), optional ASCII fold and prefix stemming -> tokens.
+
+    Prefix stemming keeps the first `stem_prefix` characters of each token, which
+    conflates suffixed forms of roots at least that long: with 5, köprüsü/köprüler/köprüde
+    -> köprü, but camii/camisi/camiler stay apart (camii, camis, camil).
+    """
+    text = unicodedata.normalize("NFC", text or "").translate(_TR_UPPER).lower()
+    if ascii_fold:
+        if unidecode is None:
+            raise RuntimeError("ascii_fold needs unidecode; pip install unidecode")
+        text = unidecode(text)
+    tokens = _TOKEN.findall(text)
+    if stem_prefix:
+        tokens = [t[:stem_prefix] for t in tokens]
+    return tokens
+
+class LexicalIndex:
+    """BM25 over an array-backed inverted index.
+
+    Postings are CSR: postings for term t are doc_ids/tfs[offsets[t]:offsets[t+1]],
+    so df is np.diff(offsets). Arrays are saved as .npy and memory-mapped on load;
+    add() buffers new records and merges them into the arrays before the next
+    search or save.
+    """
+
+    def __init__(self, ascii_fold=False, stem_prefix=0, k1=1.2, b=0.75):
+        self.params = {"ascii_fold": ascii_fold, "stem_prefix": stem_prefix, "k1": k1, "b": b}
+        self.vocab = {}
+        self.meta = []
+        self.urls = set()
+        self.hashes = set()  # content hashes of records without a source_url
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.float32)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self._pending = []  # (term_ids, tfs) per added document, not yet merged
+
+    def __len__(self):
+        return len(self.meta)
+
+    def tokens(self, text):
+        return normalize(text, self.params["ascii_fold"], self.params["stem_prefix"])
+
+    @staticmethod
+    def content_hash(x):
+        payload = json.dumps([x.get(f) for f in FIELDS], ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def add(self, records):
+        """Index records not already present (by source_url, or by content hash when there is none);
+        returns how many were added."""
+        added = 0
+        for x in records:
+            url = x.get("source_url")
+            h = None if url else self.content_hash(x)
+            if (url in self.urls) if url else (h in self.hashes):
+                continue
+            doc = len(self.meta)
+            tf = {}
+            for field, w in FIELDS.items():
+                for t in self.tokens(x.get(field)):
+                    tf[t] = tf.get(t, 0.0) + w
+            tids = np.fromiter((self.vocab.setdefault(t, len(self.vocab)) for t in tf), dtype=np.int64, count=len(tf))
+            self._pending.append((tids, np.fromiter(tf.values(), dtype=np.float32, count=len(tf))))
+            self.meta.append({k: x.get(k) for k in META_FIELDS})
+            if url:
+                self.urls.add(url)
+            else:
+                self.hashes.add(h)
+            added += 1
+        return added
+
+    def _merge(self):
+        if not self._pending:
+            return
+        first = len(self.doc_len)
+        new_tids = [t for t, _ in self._pending]
+        new_tfs = [f for _, f in self._pending]
+        self._pending = []
+        sizes = [len(t) for t in new_tids]
+        old_terms = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        terms = np.concatenate([old_terms, *new_tids])
+        docs = np.concatenate([self.doc_ids, np.repeat(np.arange(first, first + len(sizes), dtype=np.int32), sizes)])
+        tfs = np.concatenate([self.tfs, *new_tfs])
+        self.doc_len = np.concatenate([self.doc_len, [f.sum() for f in new_tfs]]).astype(np.float32)
+        v = len(self.vocab)
+        order = np.lexsort((docs, terms))
+        self.doc_ids, self.tfs = docs[order], tfs[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(terms, minlength=v))]).astype(np.int64)
+
+    def search(self, query, k=10):
+        self._merge()
+        n = len(self.meta)
+        terms = [self.vocab[t] for t in dict.fromkeys(self.tokens(query)) if t in self.vocab]
+        if not n or not terms:
+            return []
+        k1, b = self.params["k1"], self.params["b"]
+        norm = k1 * (1 - b + b * self.doc_len / max(float(self.doc_len.mean()), 1e-9))
+        scores = np.zeros(n, dtype=np.float32)
+        for t in terms:
+            s, e = self.offsets[t], self.offsets[t + 1]
+            ids, tf = self.doc_ids[s:e], self.tfs[s:e]
+            idf = math.log(1 + (n - (e - s) + 0.5) / ((e - s) + 0.5))
+            scores[ids] += idf * tf * (k1 + 1) / (tf + norm[ids])
+        hits = np.flatnonzero(scores)
+        k = min(k, len(hits))
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [dict(self.meta[i], score=float(scores[i])) for i in top]
+
+    def save(self, path=INDEX_DIR):
+        self._merge()
+        os.makedirs(path, exist_ok=True)
+        for name in ("offsets", "doc_ids", "tfs", "doc_len"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.jsonl"), "wb") as f:
+            for m in self.meta:
+                f.write(dumps_line(m))
+        json.dump({"params": self.params, "count": len(self.meta), "vocab": self.vocab,
+                   "content_hashes": sorted(self.hashes)},
+                  open(os.path.join(path, "index.json"), "w", encoding="utf-8"), ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=INDEX_DIR, mmap=True):
+        info = json.load(open(os.path.join(path, "index.json"), encoding="utf-8"))
+        ix = cls(**info["params"])
+        ix.vocab = info["vocab"]
+        for name in ("offsets", "doc_ids", "tfs", "doc_len"):
+            setattr(ix, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None))
+        with open(os.path.join(path, "meta.jsonl"), "rb") as f:
+            ix.meta = [loads(line) for line in f]
+        ix.urls = {m["source_url"] for m in ix.meta if m.get("source_url")}
+        ix.hashes = set(info.get("content_hashes", ()))
+        return ix
+
+def iter_records(path):
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+def main(cfg_path="configs/scraping.yaml", rebuild=False, query=None, k=10):
+    cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
+    sc = cfg.get("search") or {}
+    path = sc.get("lexical_index", INDEX_DIR)
+    t0 = time.perf_counter()
+    if not rebuild and os.path.exists(os.path.join(path, "index.json")):
+        ix = LexicalIndex.load(path, mmap=False)
+    else:
+        ix = LexicalIndex(sc.get("ascii_fold", False), sc.get("stem_prefix", 0))
+    added = ix.add(iter_records(cfg["storage"]["processed_jsonl"]))
+    if added or rebuild:
+        ix.save(path)
+    print(f"[✓] lexical index {path}: +{added} records, {len(ix)} total, "
+          f"{len(ix.vocab)} terms in {time.perf_counter() - t0:.2f}s")
+    if query:
+        for r in ix.search(query, k):
+            print(f"{r['score']:7.3f}  {r['name']}  ({r['city']})  {r['source_url']}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/scraping.yaml")
+    ap.add_argument("--rebuild", action="store_true", help="ignore the existing index instead of adding new records")
+    ap.add_argument("--query", help="run one query against the index afterwards")
+    ap.add_argument("-k", type=int, default=10)
+    args = ap.parse_args()
+    main(args.config, args.rebuild, args.query, args.k)
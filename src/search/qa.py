@@ -0,0 +1,30 @@
+from .lexical import LexicalIndex
+from .store import RecordStore
+from ..modeling.reader import ExtractiveReader
+
+class QAPipeline:
+    """Retrieve-then-read: BM25 shortlists top_k monuments, the extractive reader scores spans in only those."""
+
+    def __init__(self, index: LexicalIndex, store: RecordStore, reader: ExtractiveReader, top_k=5):
+        self.index, self.store, self.reader, self.top_k = index, store, reader, top_k
+
+    def answer(self, queries):
+        """queries: list of (question, k or None) -> one answer dict (or None) per question, read in one batch."""
+        hits, contexts = [], []
+        for q, k in queries:
+            found = []
+            for h in self.index.search(q, k or self.top_k):
+                rec = self.store.get(h["source_url"])
+                if rec and rec.get("text_clean"):
+                    found.append((h, rec["text_clean"]))
+            hits.append([h for h, _ in found])
+            contexts.append([(h["source_url"], text) for h, text in found])
+        out = []
+        for (q, _), best, cands in zip(queries, self.reader.answer([q for q, _ in queries], contexts), hits):
+            if best is None:
+                out.append({"question": q, "answer": None, "score": None, "source_url": None, "candidates": len(cands)})
+                continue
+            h = cands[best.pop("context")]
+            out.append(dict(question=q, **best, source_url=h["source_url"], name=h.get("name"),
+                            city=h.get("city"), retrieval_score=h["score"], candidates=len(cands)))
+        return out
@@ -0,0 +1,32 @@
+import os
+from ..preprocess.jsonio import loads
+
+class RecordStore:
+    """source_url -> record from a JSONL file, via an in-memory byte-offset table and os.pread.
+
+    Only offsets are held in memory; records are read on demand, and pread keeps
+    concurrent lookups from different threads independent of a shared file position.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = {}
+        pos = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    url = loads(line).get("source_url")
+                    if url:
+                        self.offsets[url] = (pos, len(line))
+                pos += len(line)
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get(self, url):
+        loc = self.offsets.get(url)
+        return loads(os.pread(self.fd, loc[1], loc[0])) if loc else None
+
+    def close(self):
+        os.close(self.fd)
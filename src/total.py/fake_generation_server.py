@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+qa_scheduler için yerel sahte generateContent sunucusu.
+
+Anahtar başına dakikalık kota uygular (aşılınca 429 + Retry-After döner),
+yapay gecikme ekler ve bağlamdan SQuAD biçiminde tek soruluk bir yanıt üretir.
+Gerçek API'ye çıkmadan zamanlayıcının verimini ölçmek için kullanılır:
+
+    python fake_generation_server.py --port 8090 --rpm 60 --latency 0.2
+    GEMINI_API_KEYS=k1,k2,k3,k4 python 4ApiQA.py veri.xlsx --base-url http://127.0.0.1:8090/v1beta --rpm 60
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from qa_packing import parse_contexts
+
+CONTEXT_RE = re.compile(r"Bağlam: (.*?)\n\s*\"\n", re.DOTALL)
+
+
+def fake_doc(context: str) -> dict:
+    first = context.split()[0] if context.split() else ""
+    return {"context": context,
+            "qas": [{"question": "Metin hangi kelimeyle başlar?", "answer": {"text": first, "answer_start": 0}}]}
+
+
+def fake_answer(prompt: str, drop_rate: float = 0.0) -> str:
+    """
+    Bağlamın ilk kelimesini cevap olarak veren SQuAD JSON'u (```json bloğu içinde).
+    Paketlenmiş prompt'ta context_id anahtarlı sonuç listesi döner; drop_rate
+    oranındaki bağlamlar yanıttan çıkarılır (geri düşme yolunu denemek için).
+    """
+    packed = parse_contexts(prompt)
+    if packed:
+        results = [dict(fake_doc(text), context_id=cid) for cid, text in packed if random.random() >= drop_rate]
+        return "```json\n" + json.dumps({"results": results}, ensure_ascii=False, indent=2) + "\n```"
+    m = CONTEXT_RE.search(prompt)
+    context = m.group(1).strip() if m else prompt[-200:]
+    return "```json\n" + json.dumps(fake_doc(context), ensure_ascii=False, indent=2) + "\n```"
+
+
+class QuotaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, rpm: float, latency: float, drop_rate: float = 0.0):
+        super().__init__(addr, Handler)
+        self.rpm, self.latency, self.drop_rate = rpm, latency, drop_rate
+        self.calls = defaultdict(deque)  # key -> monotonic times of accepted calls in the last 60 s
+        self.lock = threading.Lock()
+        self.counts = defaultdict(int)
+
+    def admit(self, key: str) -> float:
+        """0 ise istek kabul edilir; değilse kotanın açılacağı süre (saniye)."""
+        now = time.monotonic()
+        with self.lock:
+            q = self.calls[key]
+            while q and now - q[0] >= 60:
+                q.popleft()
+            if len(q) >= self.rpm:
+                self.counts["429"] += 1
+                return 60 - (now - q[0])
+            q.append(now)
+            self.counts["200"] += 1
+            return 0.0
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            return self._send(200, dict(self.server.counts))
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        key = self.headers.get("x-goog-api-key", "")
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not key:
+            return self._send(400, {"error": {"code": 400, "message": "API key missing"}})
+        wait = self.server.admit(key)
+        if wait:
+            return self._send(429, {"error": {"code": 429, "message": "quota exceeded"}},
+                              {"Retry-After": f"{wait:.2f}"})
+        time.sleep(self.server.latency)
+        prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+        self._send(200, {"candidates": [{"content": {"role": "model", "parts": [{"text": fake_answer(prompt, self.server.drop_rate)}]}}]})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="fake Gemini generateContent server with per-key quotas")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--rpm", type=float, default=60, help="requests per minute allowed per key")
+    ap.add_argument("--latency", type=float, default=0.2, help="seconds per successful call")
+    ap.add_argument("--drop-rate", type=float, default=0.0, help="fraction of contexts left out of packed answers")
+    args = ap.parse_args()
+    srv = QuotaServer(("127.0.0.1", args.port), args.rpm, args.latency, args.drop_rate)
+    print(f"fake generation server on http://127.0.0.1:{args.port}/v1beta (rpm={args.rpm}/key)")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
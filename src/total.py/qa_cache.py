@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM yanıtları için içerik adresli, kalıcı (SQLite) önbellek.
+
+Anahtar; model adı, prompt şablonu (PromtAgentV_02 dahil), üretim ayarları ve
+bağlam metninin SHA-256 özetidir. Bunlardan herhangi biri değişirse anahtar da
+değişir, yani prompt değiştiğinde eski yanıtlar yanlışlıkla kullanılmaz; aynı
+ayarlarla yapılan tekrar çalıştırmalar ise API'ye hiç gitmez.
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+
+def cache_key(model_name: str, template: str, generation_config: Dict[str, Any], context: str) -> str:
+    """
+    Bir bağlam için önbellek anahtarı üretir.
+
+    Args:
+        model_name (str): Model adı.
+        template (str): Bağlam yer tutucusuyla prompt şablonu.
+        generation_config (Dict[str, Any]): Üretim ayarları.
+        context (str): Bağlam metni.
+
+    Returns:
+        str: Hex SHA-256 özeti.
+    """
+    payload = json.dumps([model_name, template, generation_config, context], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    key -> yanıt metni tablosu. WAL kipinde açılır, yazmalar kilitle sıralanır.
+
+    Args:
+        path (str): SQLite dosyası.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, created_at REAL)"
+        )
+        self.db.commit()
+        self.hits = self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, model_name: str = "") -> None:
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model_name, response, time.time()),
+            )
+            self.db.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
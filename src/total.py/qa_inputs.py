@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+4ApiQA için akış (streaming) girdi okuyucuları.
+
+Dosya bütünüyle belleğe alınmaz: xlsx openpyxl'in salt-okunur kipinde satır
+satır, CSV csv modülüyle, monuments.jsonl ise satır satır okunur. Her satır
+hafif bir Row demeti olarak üretilir; böylece üretim ilk satırla başlar ve
+bellek kullanımı girdi boyutundan bağımsız kalır.
+"""
+
+import os
+import csv
+import json
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+
+class Row(NamedTuple):
+    """row_index: 0 tabanlı veri satırı sırası (pandas df.index ile aynı), context: bağlam metni."""
+    row_index: int
+    context: str
+    row_data: Dict[str, Any]
+
+
+def iter_xlsx(path: str, context_column: str = "context", sheet: Optional[str] = None) -> Iterator[Row]:
+    """
+    xlsx dosyasını salt-okunur kipte satır satır okur (ilk satır başlık).
+
+    Args:
+        path (str): Excel dosyası.
+        context_column (str): Bağlamı taşıyan sütun.
+        sheet (Optional[str]): Sayfa adı; verilmezse etkin sayfa.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as err:
+        raise RuntimeError("reading .xlsx needs openpyxl; pip install openpyxl") from err
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.active
+        rows = ws.iter_rows(values_only=True)
+        header = [str(h) if h is not None else f"col_{i}" for i, h in enumerate(next(rows, ()))]
+        for index, values in enumerate(rows):
+            if values is None or all(v is None for v in values):
+                continue
+            row_data = dict(zip(header, values))
+            context = row_data.get(context_column)
+            yield Row(index, "" if context is None else str(context), row_data)
+    finally:
+        wb.close()
+
+
+def iter_csv(path: str, context_column: str = "context") -> Iterator[Row]:
+    """CSV dosyasını (UTF-8, ilk satır başlık) satır satır okur."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for index, row_data in enumerate(csv.DictReader(f)):
+            yield Row(index, row_data.get(context_column) or "", row_data)
+
+
+def monument_context(record: Dict[str, Any], field: str = "text_clean") -> str:
+    """monuments.jsonl kaydından bağlam: "Ad - İl: metin" (ad/il yoksa yalnız metin)."""
+    text = record.get(field) or ""
+    head = " - ".join(p for p in (record.get("name"), record.get("city")) if p)
+    return f"{head}: {text}" if head and text else head or text
+
+
+def iter_monuments(path: str, context_column: str = "text_clean") -> Iterator[Row]:
+    """
+    Ön-işleme hattının ürettiği monuments.jsonl'i doğrudan okur.
+    row_index boş olmayan satırların sırasıdır ve dosya yeniden yazılınca kayar; row_data kaynağı
+    (source_url, ad, il, ilçe) taşır ve kaldığı yerden devam source_url ile yapılır (qa_output.row_key).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            context = monument_context(rec, context_column)
+            row_data = {"context": context, "source_url": rec.get("source_url"), "name": rec.get("name"),
+                        "city": rec.get("city"), "district": rec.get("district")}
+            yield Row(index, context, row_data)
+            index += 1
+
+
+READERS = {".xlsx": iter_xlsx, ".xlsm": iter_xlsx, ".csv": iter_csv, ".jsonl": iter_monuments}
+
+
+def open_rows(path: str, context_column: Optional[str] = None) -> Iterator[Row]:
+    """
+    Uzantıya göre uygun okuyucuyu seçer.
+
+    Args:
+        path (str): .xlsx / .xlsm / .csv / .jsonl dosyası.
+        context_column (Optional[str]): Bağlam sütunu; verilmezse okuyucunun varsayılanı
+            (tablolar için "context", monuments.jsonl için "text_clean").
+
+    Returns:
+        Iterator[Row]: Satırlar.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"Unsupported input {path}; expected one of {sorted(READERS)}")
+    reader = READERS[ext]
+    return reader(path, context_column) if context_column else reader(path)
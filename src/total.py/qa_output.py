@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+4ApiQA için yalnızca eklemeli (append-only) JSONL çıktı ve kaldığı yerden devam.
+
+Her yanıt answers.jsonl'e, her hata errors.jsonl'e anında (veya küçük
+gruplar halinde) yazılır; çökme durumunda en fazla flush_every kayıt kaybolur.
+Yeniden başlatmada scan_outputs() mevcut dosyaları (eski output_part_*.json ve
+error_responses.json dahil) tarar: tamamlanan satırlar atlanır, yalnızca
+hatalı veya hiç işlenmemiş satırlar tekrar gönderilir. Satırlar source_url
+taşıyorsa (monuments.jsonl) o, yoksa row_index ile tanınır.
+"""
+
+import os
+import json
+import glob
+import logging
+from typing import Any, Dict, Iterator, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+ANSWERS_FILE = "answers.jsonl"
+ERRORS_FILE = "errors.jsonl"
+
+
+def repair_tail(path: str) -> None:
+    """Yarım kalmış son satırı sonlandırır, böylece sonraki kayıt ona yapışmaz."""
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """JSONL kayıtlarını okur; bozuk (yarım yazılmış) satırları atlar."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def iter_legacy(pattern: str) -> Iterator[Dict[str, Any]]:
+    """Eski sürümün JSON dizisi dosyalarındaki (output_part_*.json, error_responses.json) kayıtlar."""
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                yield from json.load(f)
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning(f"Skipping unreadable output {path}: {exc}")
+
+
+def row_key(row_index: int, row_data: Optional[Dict[str, Any]]) -> Union[int, str]:
+    """
+    Kaldığı yerden devam için satır kimliği.
+
+    monuments.jsonl yeniden sıkıştırıldığında veya tekilleştirildiğinde satır sırası
+    kayar; bu yüzden source_url varsa o, yoksa (xlsx/csv) row_index kullanılır.
+    """
+    url = (row_data or {}).get("source_url")
+    return url if url else int(row_index)
+
+
+def scan_outputs(output_dir: str) -> Tuple[Set[Union[int, str]], Set[Union[int, str]]]:
+    """
+    Çıktı klasöründe tamamlanmış ve hatalı satırları bulur.
+
+    Args:
+        output_dir (str): Çıktı klasörü.
+
+    Returns:
+        Tuple[Set, Set]: (tamamlanan satır kimlikleri, yalnızca hata almış satır kimlikleri); bkz. row_key().
+    """
+    key = lambda r: row_key(r["row_index"], r.get("row_data"))
+    done = {key(r) for r in iter_jsonl(os.path.join(output_dir, ANSWERS_FILE))}
+    done |= {key(r) for r in iter_legacy(os.path.join(output_dir, "output_part_*.json"))}
+    failed = {key(r) for r in iter_jsonl(os.path.join(output_dir, ERRORS_FILE))}
+    failed |= {key(r) for r in iter_legacy(os.path.join(output_dir, "error_responses.json"))}
+    return done, failed - done
+
+
+class OutputWriter:
+    """
+    answers.jsonl / errors.jsonl dosyalarına ekleme yapan yazıcı.
+
+    Args:
+        output_dir (str): Çıktı klasörü.
+        flush_every (int): Kaç kayıtta bir diske aktarılacağı (1 = her kayıtta).
+    """
+
+    def __init__(self, output_dir: str, flush_every: int = 1):
+        os.makedirs(output_dir, exist_ok=True)
+        self.flush_every = max(1, flush_every)
+        self.files = {}
+        self.pending = {}
+        for name in (ANSWERS_FILE, ERRORS_FILE):
+            path = os.path.join(output_dir, name)
+            repair_tail(path)
+            self.files[name] = open(path, "a", encoding="utf-8")
+            self.pending[name] = 0
+
+    def _write(self, name: str, record: Dict[str, Any]) -> None:
+        f = self.files[name]
+        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.pending[name] += 1
+        if self.pending[name] >= self.flush_every:
+            f.flush()
+            os.fsync(f.fileno())
+            self.pending[name] = 0
+
+    def write_answer(self, record: Dict[str, Any]) -> None:
+        self._write(ANSWERS_FILE, record)
+
+    def write_error(self, record: Dict[str, Any]) -> None:
+        self._write(ERRORS_FILE, record)
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
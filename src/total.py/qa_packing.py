@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tek istekte birden fazla bağlam (packing) için prompt kurma ve yanıt ayırma.
+
+Uzun sistem talimatı (PromtAgentV_02) K bağlam için bir kez gönderilir. Her
+bağlam belirgin ayraçlarla ve kısa bir context_id ile işaretlenir; modelden
+context_id anahtarlı tek bir JSON nesnesi istenir. split_packed_response()
+her sonucu tek bağlamlı moddaki yanıt biçimine ("```json {context, qas}```")
+çevirir; eksik veya bozuk gelen bağlamlar çağıran tarafça tek tek yeniden istenir.
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Tuple
+
+OPEN = "<<<BAĞLAM id={cid}>>>"
+CLOSE = "<<<BAĞLAM SONU id={cid}>>>"
+BLOCK_RE = re.compile(r"<<<BAĞLAM id=(\S+?)>>>\n(.*?)\n<<<BAĞLAM SONU id=\1>>>", re.DOTALL)
+FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def build_packed_prompt(system_instruction: str, items: List[Tuple[str, str]]) -> str:
+    """
+    K bağlamı tek prompt'ta birleştirir.
+
+    Args:
+        system_instruction (str): Tüm bağlamlar için ortak talimat (PromtAgentV_02).
+        items (List[Tuple[str, str]]): (context_id, bağlam) çiftleri.
+
+    Returns:
+        str: Paketlenmiş prompt.
+    """
+    blocks = "\n\n".join(f"{OPEN.format(cid=cid)}\n{text}\n{CLOSE.format(cid=cid)}" for cid, text in items)
+    ids = ", ".join(cid for cid, _ in items)
+    return (f"""
+    ---
+    {system_instruction}
+    ---
+    **Role: User, Content**:
+    Aşağıda {len(items)} ayrı bağlam var; her biri {OPEN.format(cid="ID")} ve {CLOSE.format(cid="ID")}
+    satırları arasında yer alıyor. Her bağlamı diğerlerinden bağımsız olarak analiz et, soruları
+    oluştur ve cevapları yaz. answer_start yalnızca kendi bağlamı içindeki konumdur.
+    Yanıtı yalnızca tek bir JSON nesnesi olarak ver, başka metin ekleme:
+    {{"results": [{{"context_id": "ID", "context": "...", "qas": [{{"question": "...", "answer": {{"text": "...", "answer_start": 0}}}}]}}]}}
+    Her context_id ({ids}) için tam olarak bir sonuç olmalı.
+
+{blocks}
+    ---
+    """)
+
+
+def parse_contexts(prompt: str) -> List[Tuple[str, str]]:
+    """Paketlenmiş prompt'taki (context_id, bağlam) çiftleri (sahte sunucu ve testler için)."""
+    return BLOCK_RE.findall(prompt)
+
+
+def _load_json(text: str) -> Any:
+    """Kod bloğu çitlerini soyar; baştaki/sondaki fazlalığa rağmen ilk JSON nesnesini okur."""
+    text = FENCE_RE.sub("", text.strip())
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in response")
+    obj, _ = json.JSONDecoder().raw_decode(text[start:])
+    return obj
+
+
+def split_packed_response(text: str, items: List[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Paketlenmiş yanıtı bağlamlara ayırır.
+
+    Args:
+        text (str): Modelin yanıtı.
+        items (List[Tuple[str, str]]): İstekte gönderilen (context_id, bağlam) çiftleri.
+
+    Returns:
+        Dict[str, str]: context_id -> tek bağlamlı moddaki biçimde yanıt. Eksik,
+        bilinmeyen id'li veya qas listesi geçersiz sonuçlar dahil edilmez.
+    """
+    try:
+        obj = _load_json(text)
+    except ValueError:
+        return {}
+    results = obj.get("results") if isinstance(obj, dict) else obj
+    if not isinstance(results, list):
+        return {}
+    contexts = dict(items)
+    out: Dict[str, str] = {}
+    for r in results:
+        if not isinstance(r, dict):
+            continue
+        cid = str(r.get("context_id", ""))
+        qas = r.get("qas")
+        if cid not in contexts or cid in out or not isinstance(qas, list) or not qas:
+            continue
+        if not all(isinstance(q, dict) and q.get("question") and isinstance(q.get("answer"), dict) for q in qas):
+            continue
+        doc = {"context": contexts[cid], "qas": qas}
+        out[cid] = "```json\n" + json.dumps(doc, ensure_ascii=False, indent=2) + "\n```"
+    return out
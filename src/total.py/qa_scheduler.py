@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Birden fazla Gemini API anahtarı üzerinden eşzamanlı içerik üretimi.
+
+Her anahtarın kendi token bucket'ı (dakikalık istek kotası) ve 429 için
+kendi üstel geri çekilme (jitter'lı) durumu vardır; modül düzeyinde global
+durum tutulmaz. Anahtarlar kaynak koddan değil, GEMINI_API_KEYS ortam
+değişkeninden veya bir dosyadan okunur. İstemci REST üzerinden konuşur,
+böylece base_url yerel sahte sunucuya (fake_generation_server.py)
+yönlendirilerek test edilebilir.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "models/gemini-1.5-flash"
+
+
+class RateLimited(Exception):
+    """429 (veya kota) yanıtı; retry_after sunucunun önerdiği bekleme süresidir (saniye)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TransientError(Exception):
+    """Yeniden denenebilir hata (5xx, zaman aşımı, bağlantı hatası)."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After başlığını saniyeye çevirir.
+
+    Args:
+        value (Optional[str]): Saniye ("30") veya HTTP tarihi ("Wed, 21 Oct 2026 07:28:00 GMT").
+
+    Returns:
+        Optional[float]: Bekleme süresi (en az 0); başlık yoksa veya çözülemezse None
+        (bu durumda yalnızca geri çekilme uygulanır).
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def load_api_keys(keys_file: Optional[str] = None, env_var: str = "GEMINI_API_KEYS") -> List[str]:
+    """
+    API anahtarlarını dosyadan (satır başına bir anahtar, '#' yorum) veya
+    virgülle ayrılmış ortam değişkeninden okur.
+
+    Args:
+        keys_file (Optional[str]): Anahtar dosyası; verilmezse ortam değişkeni kullanılır.
+        env_var (str): Ortam değişkeninin adı.
+
+    Returns:
+        List[str]: Tekrarsız anahtar listesi (sıra korunur).
+    """
+    if keys_file:
+        with open(keys_file, "r", encoding="utf-8") as f:
+            raw = [line.split("#", 1)[0].strip() for line in f]
+    else:
+        raw = [k.strip() for k in os.environ.get(env_var, "").split(",")]
+    keys = list(dict.fromkeys(k for k in raw if k))
+    if not keys:
+        raise ValueError(f"No API keys found (set {env_var} or pass a keys file).")
+    return keys
+
+
+class GenerationClient:
+    """
+    generateContent REST uç noktası için ince istemci.
+
+    Args:
+        base_url (str): API kökü; testte yerel sahte sunucu adresi verilir.
+        model (str): "models/..." biçiminde model adı.
+        timeout (float): İstek zaman aşımı (saniye).
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, model: str = DEFAULT_MODEL,
+                 timeout: float = 120.0, pool_size: int = 16):
+        self.url = f"{base_url.rstrip('/')}/{model}:generateContent"
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def payload(prompt: str, generation_config: Dict[str, Any]) -> Dict[str, Any]:
+        """SDK'daki snake_case ayarları REST gövdesindeki camelCase alanlara çevirir."""
+        camel = {
+            "".join(p.capitalize() if i else p for i, p in enumerate(k.split("_"))): v
+            for k, v in generation_config.items()
+        }
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}], "generationConfig": camel}
+
+    def generate(self, api_key: str, prompt: str, generation_config: Dict[str, Any]) -> str:
+        """
+        Tek bir üretim isteği gönderir.
+
+        Returns:
+            str: İlk adayın metni; aday yoksa boş dize.
+
+        Raises:
+            RateLimited: 429 yanıtında.
+            TransientError: 5xx veya ağ hatasında.
+            requests.HTTPError: Diğer 4xx hatalarında (yeniden denenmez).
+        """
+        try:
+            # anahtar sorgu dizesinde değil başlıkta: URL'ler log ve hata mesajlarına düşer
+            resp = self.session.post(self.url, headers={"x-goog-api-key": api_key},
+                                     json=self.payload(prompt, generation_config), timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as err:
+            raise TransientError(str(err)) from err
+        if resp.status_code == 429:
+            raise RateLimited("429 Too Many Requests", parse_retry_after(resp.headers.get("Retry-After")))
+        if resp.status_code >= 500:
+            raise TransientError(f"{resp.status_code} {resp.reason}")
+        resp.raise_for_status()
+        candidates = resp.json().get("candidates") or []
+        if not candidates:
+            logger.warning("No candidate found in response.")
+            return ""
+        parts = candidates[0].get("content", {}).get("parts") or [{}]
+        return parts[0].get("text", "")
+
+
+def mask_key(key: str) -> str:
+    """Log ve istatistikler için anahtarın yalnızca son 4 karakteri ("…9999")."""
+    return "…" + key[-4:]
+
+
+class KeyPool:
+    """
+    Anahtar başına token bucket + üstel geri çekilme.
+
+    acquire(), en erken kullanılabilir anahtarı bekleyerek döndürür; böylece
+    toplam hız, anahtar kotalarının toplamına yaklaşır ve 429 alan anahtar
+    yalnızca kendi süresi boyunca devre dışı kalır.
+
+    Args:
+        keys (List[str]): API anahtarları.
+        rpm (float): Anahtar başına dakikadaki istek kotası.
+        burst (int): Bucket kapasitesi (art arda gönderilebilecek istek sayısı).
+        base_backoff (float): İlk 429 sonrası bekleme (saniye); her ardışık 429'da iki katına çıkar.
+        max_backoff (float): Geri çekilme üst sınırı (saniye).
+    """
+
+    def __init__(self, keys: List[str], rpm: float = 15.0, burst: int = 1,
+                 base_backoff: float = 2.0, max_backoff: float = 120.0, seed: Optional[int] = None):
+        now = time.monotonic()
+        self.keys = list(keys)
+        self.rate = rpm / 60.0
+        self.burst = burst
+        self.base_backoff, self.max_backoff = base_backoff, max_backoff
+        self.tokens = {k: float(burst) for k in self.keys}
+        self.updated = {k: now for k in self.keys}
+        self.blocked_until = {k: 0.0 for k in self.keys}
+        self.failures = {k: 0 for k in self.keys}
+        # istatistikler maskeli etiketle tutulur; özet loglarına anahtarın kendisi yazılmaz
+        self.labels = {k: f"#{i} {mask_key(k)}" for i, k in enumerate(self.keys)}
+        self.stats = {self.labels[k]: {"ok": 0, "rate_limited": 0} for k in self.keys}
+        self.cond = threading.Condition()
+        self.rng = random.Random(seed)
+
+    def _ready_at(self, key: str, now: float) -> float:
+        self.tokens[key] = min(self.burst, self.tokens[key] + (now - self.updated[key]) * self.rate)
+        self.updated[key] = now
+        token_at = now if self.tokens[key] >= 1 else now + (1 - self.tokens[key]) / self.rate
+        return max(token_at, self.blocked_until[key])
+
+    def acquire(self) -> str:
+        """Kotası ve geri çekilmesi izin veren ilk anahtarı alır (gerekirse bekler)."""
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                ready, key = min((self._ready_at(k, now), k) for k in self.keys)
+                if ready <= now:
+                    self.tokens[key] -= 1
+                    return key
+                self.cond.wait(ready - now)
+
+    def success(self, key: str) -> None:
+        with self.cond:
+            self.failures[key] = 0
+            self.stats[self.labels[key]]["ok"] += 1
+
+    def rate_limited(self, key: str, retry_after: Optional[float] = None) -> float:
+        """
+        429 sonrası anahtarı "full jitter" ile geri çeker: U(0, min(max, base * 2^n)).
+        Sunucu Retry-After verdiyse en az o kadar beklenir.
+
+        Returns:
+            float: Anahtarın bekleyeceği süre (saniye).
+        """
+        with self.cond:
+            self.failures[key] += 1
+            self.stats[self.labels[key]]["rate_limited"] += 1
+            cap = min(self.max_backoff, self.base_backoff * 2 ** (self.failures[key] - 1))
+            delay = max(self.rng.uniform(0, cap), retry_after or 0.0)
+            self.blocked_until[key] = max(self.blocked_until[key], time.monotonic() + delay)
+            self.tokens[key] = min(self.tokens[key], 0.0)
+            self.cond.notify_all()
+            return delay
+
+
+class GenerationScheduler:
+    """
+    Satırları tüm anahtarlara dağıtarak eşzamanlı üretim yapar.
+
+    Args:
+        client (GenerationClient): REST istemcisi.
+        pool (KeyPool): Anahtar kotaları ve geri çekilme durumu.
+        workers (int): Aynı anda uçuşta olabilecek istek sayısı.
+        max_attempts (int): Bir satır için 429/geçici hata dahil toplam deneme sayısı.
+    """
+
+    def __init__(self, client: GenerationClient, pool: KeyPool, workers: int = 8, max_attempts: int = 8):
+        self.client = client
+        self.pool = pool
+        self.workers = workers
+        self.max_attempts = max_attempts
+
+    def _run_one(self, prompt: str, generation_config: Dict[str, Any]) -> str:
+        last: Optional[Exception] = None
+        for attempt in range(1, self.max_attempts + 1):
+            key = self.pool.acquire()
+            try:
+                text = self.client.generate(key, prompt, generation_config)
+            except RateLimited as err:
+                delay = self.pool.rate_limited(key, err.retry_after)
+                logger.warning(f"429 on key {self.pool.labels[key]} (attempt {attempt}); key paused {delay:.1f}s")
+                last = err
+                continue
+            except TransientError as err:
+                logger.warning(f"Transient error on key {self.pool.labels[key]} (attempt {attempt}): {err}")
+                time.sleep(min(self.pool.max_backoff, self.pool.base_backoff * 2 ** (attempt - 1)) * random.random())
+                last = err
+                continue
+            self.pool.success(key)
+            return text
+        raise RuntimeError(f"Gave up after {self.max_attempts} attempts: {last}")
+
+    def run(self, jobs: Iterable[Tuple[Any, str]], generation_config: Dict[str, Any]
+            ) -> Iterator[Tuple[Any, Optional[str], Optional[str]]]:
+        """
+        (job_id, prompt) çiftlerini işler; tamamlanma sırasına göre
+        (job_id, yanıt, hata) üretir. Uçuştaki iş sayısı workers * 2 ile
+        sınırlıdır, bu yüzden büyük girdiler belleğe alınmaz.
+        """
+        jobs = iter(jobs)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gen") as ex:
+            pending = {}
+
+            def fill():
+                while len(pending) < self.workers * 2:
+                    try:
+                        job_id, prompt = next(jobs)
+                    except StopIteration:
+                        return
+                    pending[ex.submit(self._run_one, prompt, generation_config)] = job_id
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    job_id = pending.pop(fut)
+                    try:
+                        yield job_id, fut.result(), None
+                    except Exception as err:
+                        yield job_id, None, str(err)
+                fill()